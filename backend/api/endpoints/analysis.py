@@ -4,9 +4,12 @@ Coordinates Translation, Grammar, and Spelling services
 """
 from fastapi import APIRouter, HTTPException
 import logging
+from typing import Dict, List, Tuple
 from langdetect import detect
 
-from ..schemas import AnalyzeRequest, AnalyzeResponse, CorrectionError
+from ..schemas import AnalyzeRequest, AnalyzeResponse, CorrectionError, TextSegment
+from config import settings
+from services.segmentation import splice, split_script_runs
 from services.translation.model import get_translation_service
 from services.grammar.model import get_grammar_service
 from services.spelling.model import get_spelling_service
@@ -14,45 +17,99 @@ from services.spelling.model import get_spelling_service
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# langdetect code -> NLLB code, and the NLLB code assumed for a script when detection fails
+LANG_MAP = {'en': 'eng_Latn', 'bn': 'ben_Beng', 'hi': 'hin_Deva', 'ur': 'urd_Arab', 'ar': 'arb_Arab'}
+SCRIPT_DEFAULT_LANG = {'Beng': 'ben_Beng', 'Latn': 'eng_Latn', 'Deva': 'hin_Deva', 'Arab': 'urd_Arab'}
+
+
+def _run_language(text: str, script: str) -> str:
+    """NLLB code for a single-script run (langdetect, constrained to the run's script)"""
+    default = SCRIPT_DEFAULT_LANG.get(script, 'eng_Latn')
+    try:
+        lang = LANG_MAP.get(detect(text))
+    except Exception:
+        return default
+    if lang is None or (script in SCRIPT_DEFAULT_LANG and not lang.endswith(script)):
+        return default
+    return lang
+
+
+def _plan_runs(text: str) -> List[Tuple[int, int, str, bool]]:
+    """
+    Script runs of the text as (start, end, language, translate).
+    Non-Bengali runs are translated unless they are short inline terms
+    inside a Bengali line (see CODE_MIX_INLINE_MAX_WORDS).
+    """
+    runs = split_script_runs(text)
+    plan = []
+    for index, (start, end, script) in enumerate(runs):
+        if script == 'Beng':
+            plan.append((start, end, 'ben_Beng', False))
+            continue
+        
+        inline = False
+        if len(text[start:end].split()) <= settings.CODE_MIX_INLINE_MAX_WORDS:
+            for neighbour in (index - 1, index + 1):
+                if 0 <= neighbour < len(runs) and runs[neighbour][2] == 'Beng':
+                    gap = text[min(end, runs[neighbour][1]):max(start, runs[neighbour][0])]
+                    inline = inline or '\n' not in gap
+        
+        plan.append((start, end, _run_language(text[start:end], script), not inline))
+    return plan
+
 @router.post("/analyze", response_model=AnalyzeResponse)
 async def analyze_text(request_data: AnalyzeRequest):
     """
     Combined analysis using all independent services:
-    1. Language detection (langdetect - lightweight)
-    2. Translation to Bengali (Translation Service - NLLB-200)
+    1. Script-run segmentation + per-run language detection (langdetect - lightweight)
+    2. Translation of non-Bengali runs to Bengali, batched (Translation Service - NLLB-200)
     3. Grammar checking (Grammar Service - mT5)
     4. Spelling checking (Spelling Service - SymSpell)
     
     Each service is independent - if one fails, others continue working.
     """
     try:
-        # 1. Detect language (lightweight, always available)
-        try:
-            detected = detect(request_data.text)
-            lang_map = {'en': 'eng_Latn', 'bn': 'ben_Beng', 'hi': 'hin_Deva'}
-            detected_lang = lang_map.get(detected, 'eng_Latn')
-        except:
-            detected_lang = "eng_Latn"
+        # 1. Split into script runs and detect each run's language (lightweight, always available)
+        text = request_data.text
+        runs = _plan_runs(text)
         
-        logger.info(f"Detected language: {detected_lang}")
+        # Dominant language by characters, reported as the detected language
+        lang_chars: Dict[str, int] = {}
+        for start, end, lang, _ in runs:
+            lang_chars[lang] = lang_chars.get(lang, 0) + end - start
+        detected_lang = max(lang_chars, key=lang_chars.get) if lang_chars else "ben_Beng"
         
-        # 2. Translate if needed (using Translation Service)
-        translated_text = request_data.text
-        if detected_lang != "ben_Beng":
+        logger.info(f"Detected language: {detected_lang} ({len(runs)} script runs)")
+        
+        # 2. Translate only the non-Bengali runs, as one batch (using Translation Service)
+        replacements = [text[start:end] for start, end, _, _ in runs]
+        translated = [False] * len(runs)
+        pending = [i for i, run in enumerate(runs) if run[3]]
+        if pending:
             translation_service = get_translation_service()
             if translation_service.ready:
-                result = await translation_service.translate(
-                    request_data.text,
-                    source_lang=detected_lang,
-                    target_lang="ben_Beng"
+                results = await translation_service.translate_batch(
+                    [
+                        {"text": replacements[i], "source_lang": runs[i][2], "target_lang": "ben_Beng"}
+                        for i in pending
+                    ],
+                    profile=request_data.profile
                 )
-                if result:
-                    translated_text = result
-                else:
-                    logger.warning("Translation failed, using original text")
+                for i, result in zip(pending, results):
+                    if result.get("translated_text"):
+                        replacements[i] = result["translated_text"]
+                        translated[i] = True
+                    else:
+                        logger.warning(f"Translation of run {i} failed, using original text: {result.get('error')}")
             else:
                 logger.warning("Translation service not ready, using original text")
         
+        translated_text, spliced = splice(text, [(start, end) for start, end, _, _ in runs], replacements)
+        segments = [
+            TextSegment(**segment, language=run[2], translated=done)
+            for segment, run, done in zip(spliced, runs, translated)
+        ]
+        
         errors = []
         
         # 3. Check spelling (using Spelling Service)
@@ -68,7 +125,10 @@ async def analyze_text(request_data: AnalyzeRequest):
         if request_data.check_grammar:
             grammar_service = get_grammar_service()
             if grammar_service.primary_ready or grammar_service.fallback_ready:
-                grammar_errors = await grammar_service.check_grammar(translated_text)
+                grammar_errors = await grammar_service.check_grammar(
+                    translated_text,
+                    profile=request_data.profile
+                )
                 errors.extend(grammar_errors)
             else:
                 logger.warning("Grammar service not ready, skipping")
@@ -84,7 +144,8 @@ async def analyze_text(request_data: AnalyzeRequest):
             detected_language=detected_lang,
             errors=errors,
             word_count=word_count,
-            char_count=char_count
+            char_count=char_count,
+            segments=segments
         )
     
     except Exception as e:
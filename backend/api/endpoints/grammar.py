@@ -26,7 +26,7 @@ async def check_grammar(request_data: GrammarCheckRequest):
                 detail="Grammar service still loading. Please wait."
             )
         
-        errors = await service.check_grammar(request_data.text)
+        errors = await service.check_grammar(request_data.text, profile=request_data.profile)
         
         # Apply corrections to generate corrected text
         corrected_text = request_data.text
@@ -44,7 +44,8 @@ async def translate_text(request_data: TranslateRequest):
         translated_text = await service.translate(
             request_data.text,
             source_lang=detected_lang,
-            target_lang=request_data.target_lang
+            target_lang=request_data.target_lang,
+            profile=request_data.profile
         )
         
         if translated_text is None:
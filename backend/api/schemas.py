@@ -5,6 +5,7 @@ class TranslateRequest(BaseModel):
     text: str = Field(..., min_length=1, max_length=10000)
     source_lang: Optional[str] = Field(None, description="Source language code (auto-detect if not provided)")
     target_lang: str = Field(default="ben_Beng", description="Target language code")
+    profile: Optional[str] = Field(None, description="Decoding profile ('interactive', 'balanced', 'quality')")
 
 class TranslateResponse(BaseModel):
     translated_text: str
@@ -33,6 +34,15 @@ class AnalyzeRequest(BaseModel):
     lang: Optional[str] = Field(None, description="Language code (auto-detect if not provided)")
     check_grammar: bool = Field(default=True)
     check_spelling: bool = Field(default=True)
+    profile: Optional[str] = Field(None, description="Decoding profile ('interactive', 'balanced', 'quality')")
+
+class TextSegment(BaseModel):
+    source_offset: int
+    source_length: int
+    target_offset: int
+    target_length: int
+    language: str
+    translated: bool
 
 class AnalyzeResponse(BaseModel):
     translated_text: str
@@ -40,6 +50,7 @@ class AnalyzeResponse(BaseModel):
     errors: List[CorrectionError]
     word_count: int
     char_count: int
+    segments: List[TextSegment] = []  # Script runs of the input and where they landed in translated_text
 
 class SpellingCheckRequest(BaseModel):
     text: str = Field(..., min_length=1)
@@ -50,6 +61,7 @@ class SpellingCheckResponse(BaseModel):
 
 class GrammarCheckRequest(BaseModel):
     text: str = Field(..., min_length=1)
+    profile: Optional[str] = Field(None, description="Decoding profile ('interactive', 'balanced', 'quality')")
 
 class GrammarCheckResponse(BaseModel):
     errors: List[CorrectionError]
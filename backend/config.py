@@ -1,5 +1,5 @@
 from pydantic_settings import BaseSettings
-from typing import List
+from typing import Dict, List
 
 class Settings(BaseSettings):
     # Application
@@ -41,6 +41,145 @@ class Settings(BaseSettings):
     MAX_LENGTH: int = 512
     BATCH_SIZE: int = 8
 
+    # Decoding profiles: beam width per task, and a generation budget of
+    # max_new_tokens = input_tokens * length_ratio + length_margin (capped at MAX_LENGTH)
+    DEFAULT_DECODING_PROFILE: str = "quality"
+    DECODING_PROFILES: Dict[str, Dict[str, float]] = {
+        "interactive": {
+            "translation_beams": 1,
+            "grammar_beams": 1,
+            "length_ratio": 1.5,
+            "length_margin": 8
+        },
+        "balanced": {
+            "translation_beams": 2,
+            "grammar_beams": 2,
+            "length_ratio": 1.8,
+            "length_margin": 12
+        },
+        "quality": {
+            "translation_beams": 5,
+            "grammar_beams": 4,
+            "length_ratio": 2.0,
+            "length_margin": 16
+        }
+    }
+
+    # Inference engines: "torch" (eager PyTorch) or "onnx" (ONNX Runtime, exported
+    # graphs cached under MODEL_CACHE_DIR/onnx)
+    TRANSLATION_ENGINE: str = "torch"
+    GRAMMAR_ENGINE: str = "torch"
+
+    # Model precision: "fp32", "int8" (dynamic quantization) or "bf16" (torch engine only).
+    # Reduced precision is refused if sample-set chrF vs fp32 drops below the minimum.
+    TRANSLATION_PRECISION: str = "fp32"
+    GRAMMAR_PRECISION: str = "fp32"
+    QUANTIZATION_MIN_CHRF: float = 90.0
+
+    # Translation Scheduler
+    TRANSLATION_BATCH_WAIT_MS: float = 5.0  # Max time a request waits for batch peers
+    TRANSLATION_CHUNK_TOKENS: int = 200  # Token budget per translated chunk
+    TRANSLATION_BATCH_MAX_ITEMS: int = 256  # Max snippets per /translate/batch request
+
+    # Code-mixed analysis: only non-Bengali script runs are translated. Runs of at
+    # most this many words inside a Bengali line (names, loanwords) are left as-is
+    CODE_MIX_INLINE_MAX_WORDS: int = 2
+
+    # Placeholder masking: URLs, emails, numbers, code and identifiers are sent to
+    # NLLB as [1], [2], ... and restored verbatim after decoding
+    TRANSLATION_PLACEHOLDERS: bool = True
+    TRANSLATION_BENGALI_DIGITS: bool = False  # Write restored numbers in Bengali numerals (ben_Beng targets)
+
+    # Trimmed vocabulary: serve an NLLB copy whose embeddings/output softmax only
+    # cover these scripts (built once under MODEL_CACHE_DIR/trimmed)
+    TRANSLATION_TRIMMED_VOCAB: bool = False
+    TRANSLATION_TRIM_SCRIPTS: str = "Beng,Latn"
+
+    # Size-tiered routing: short requests on latency-oriented profiles go to a
+    # smaller NLLB variant (also under queue pressure). Opt-in: empty disables it,
+    # e.g. "facebook/nllb-200-distilled-600M"
+    TRANSLATION_SMALL_MODEL: str = ""
+    TRANSLATION_SMALL_PROFILES: str = "interactive,balanced"  # Profiles allowed on the small model
+    TRANSLATION_SMALL_MAX_TOKENS: int = 48  # Inputs up to this many tokens use the small model
+    TRANSLATION_OVERLOAD_QUEUE_DEPTH: int = 32  # Queue depth at which longer inputs also go small
+
+    # Speculative decoding: a smaller NLLB drafts tokens that the main model
+    # verifies, for greedy (1-beam) profiles and single-text batches only (a padded
+    # batch is faster than decoding its texts one by one). Opt-in: empty disables it,
+    # e.g. "facebook/nllb-200-distilled-600M"
+    TRANSLATION_DRAFT_MODEL: str = ""
+    TRANSLATION_DRAFT_TOKENS: int = 5  # Tokens drafted per verification pass
+
+    # Translation Memory
+    TRANSLATION_MEMORY_ENABLED: bool = True
+    TRANSLATION_MEMORY_SIZE: int = 10000  # In-process LRU entries
+    TRANSLATION_MEMORY_PATH: str = "./models/translation_memory.db"  # Empty disables disk tier
+    # Disk tier bounds, pruned on startup and every 1000 inserts (0 disables a bound)
+    TRANSLATION_MEMORY_MAX_ROWS: int = 500000  # Oldest rows are deleted beyond this
+    TRANSLATION_MEMORY_MAX_AGE_DAYS: float = 30.0
+
+    # Grammar checking: sentences are corrected in padded batches of BATCH_SIZE;
+    # longer sentences are split into overlapping windows
+    GRAMMAR_WINDOW_TOKENS: int = 128
+    GRAMMAR_WINDOW_OVERLAP: int = 24  # Tokens of context shared by neighbouring windows
+
+    # Grammar cascade: IndicBERT scores each sentence (1 - masked probability of its
+    # least plausible token; the masked variants of all sentences are batched
+    # GRAMMAR_FALLBACK_MAX_VARIANTS rows per pass); only sentences at or above the
+    # threshold go to mT5. Off until the threshold is calibrated on labelled data
+    GRAMMAR_CASCADE: bool = False
+    GRAMMAR_CASCADE_THRESHOLD: float = 0.9
+
+    # IndicBERT fallback (when mT5 is unavailable): tokens whose masked-LM probability
+    # is below the threshold are flagged with top-k replacements
+    GRAMMAR_FALLBACK_THRESHOLD: float = 0.001
+    GRAMMAR_FALLBACK_TOP_K: int = 3
+    GRAMMAR_FALLBACK_MAX_VARIANTS: int = 64  # Masked variants per forward pass
+
+    # Hot standby: keep IndicBERT resident and divert grammar requests to it while
+    # mT5's rolling p95 latency or error rate is over budget (circuit breaker).
+    # Latency is mT5 time per corrected sentence, so it does not grow with documents
+    GRAMMAR_HOT_STANDBY: bool = False
+    GRAMMAR_LATENCY_SLO_MS: float = 500.0
+    GRAMMAR_MAX_ERROR_RATE: float = 0.2
+    GRAMMAR_BREAKER_WINDOW: int = 100  # Requests in the rolling window
+    GRAMMAR_BREAKER_COOLDOWN_S: float = 30.0  # Time before mT5 is probed again
+
+    # Grammar cache: normalized sentence + model/decoding settings -> correction,
+    # LRU-evicted by entry count and approximate bytes
+    GRAMMAR_CACHE_ENABLED: bool = True
+    GRAMMAR_CACHE_ENTRIES: int = 50000
+    GRAMMAR_CACHE_BYTES: int = 32 * 1024 * 1024
+
+    # Input-as-draft fast path (greedy profiles only): sentences mT5 would copy
+    # unchanged are confirmed in one teacher-forced pass; a single remaining
+    # sentence verifies up to GRAMMAR_DRAFT_TOKENS copied tokens per forward pass
+    # where the output diverges (several use padded batches). Beam profiles always
+    # run full beam search
+    GRAMMAR_COPY_DRAFT: bool = True
+    GRAMMAR_DRAFT_TOKENS: int = 64
+
+    # Spelling: Bengali frequency lexicon ("word count" per line) and the prebuilt
+    # SymSpell snapshot (python -m services.spelling.lexicon; rebuilt if stale)
+    SPELLING_LEXICON_PATH: str = "./models/bengali_lexicon.txt"
+    SPELLING_SNAPSHOT_PATH: str = "./models/symspell_bn.pickle.gz"
+    SPELLING_MAX_EDIT_DISTANCE: int = 2
+    SPELLING_PREFIX_LENGTH: int = 7
+    # Spelling engine: "symspell" (deletes index, fastest lookups) or "trie"
+    # (memory-mapped lexicon trie + Levenshtein automaton, shared across workers;
+    # python -m services.spelling.trie; rebuilt if stale)
+    SPELLING_ENGINE: str = "symspell"
+    SPELLING_TRIE_PATH: str = "./models/bengali_lexicon.trie"
+    # Suffix morphology: a stem tagged "n"/"v" in the lexicon's third column plus a
+    # valid suffix chain of that paradigm counts as correct; fuzzy search runs on the
+    # stems of the N longest chains before the whole word (compact a full-form
+    # lexicon to tagged stems: python -m services.spelling.morphology <in> <out>)
+    SPELLING_MORPHOLOGY: bool = False
+    SPELLING_STEM_SEARCHES: int = 2
+    # Word -> suggestions memo size, and words per executor lookup batch
+    SPELLING_MEMO_ENTRIES: int = 100000
+    SPELLING_LOOKUP_BATCH: int = 256
+
     @property
     def cors_origins_list(self) -> List[str]:
         return [origin.strip() for origin in self.CORS_ORIGINS.split(",")]
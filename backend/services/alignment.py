@@ -0,0 +1,170 @@
+"""
+Token Alignment
+Tokenization with character offsets and a linear-space Myers diff over
+token sequences, shared by the grammar, spelling and analysis code to turn
+"original vs. corrected" text into precise edit spans.
+"""
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# (token text, start offset, end offset)
+Token = Tuple[str, int, int]
+
+# (tag, a_start, a_end, b_start, b_end) with tag in equal/replace/delete/insert,
+# as in difflib.SequenceMatcher.get_opcodes()
+Opcode = Tuple[str, int, int, int, int]
+
+_TOKEN_RE = re.compile(r'\S+')
+
+
+def tokenize(text: str, pattern: Optional[re.Pattern] = None) -> List[Token]:
+    """Split text into tokens (default: whitespace-separated) with their offsets"""
+    return [(m.group(0), m.start(), m.end()) for m in (pattern or _TOKEN_RE).finditer(text)]
+
+
+def _middle_snake(a: Sequence, a_lo: int, a_hi: int, b: Sequence, b_lo: int, b_hi: int) -> Tuple[int, int, int, int]:
+    """
+    Find the middle snake of an optimal edit path (Myers 1986, section 4b).
+    Returns (x_start, y_start, x_end, y_end) relative to (a_lo, b_lo).
+    """
+    n, m = a_hi - a_lo, b_hi - b_lo
+    delta = n - m
+    odd = delta & 1
+    max_d = (n + m + 1) // 2
+    offset = max_d + 1
+    forward = [0] * (2 * offset + 1)
+    backward = [0] * (2 * offset + 1)
+
+    for d in range(max_d + 1):
+        # Forward search from the top-left corner
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and forward[offset + k - 1] < forward[offset + k + 1]):
+                x = forward[offset + k + 1]
+            else:
+                x = forward[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a_lo + x] == b[b_lo + y]:
+                x += 1
+                y += 1
+            forward[offset + k] = x
+            if odd and -(d - 1) <= delta - k <= d - 1 and x + backward[offset + delta - k] >= n:
+                return x_start, y_start, x, y
+
+        # Backward search from the bottom-right corner (in reversed coordinates)
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and backward[offset + k - 1] < backward[offset + k + 1]):
+                x = backward[offset + k + 1]
+            else:
+                x = backward[offset + k - 1] + 1
+            y = x - k
+            x_start, y_start = x, y
+            while x < n and y < m and a[a_hi - 1 - x] == b[b_hi - 1 - y]:
+                x += 1
+                y += 1
+            backward[offset + k] = x
+            if not odd and -d <= delta - k <= d and x + forward[offset + delta - k] >= n:
+                return n - x, m - y, n - x_start, m - y_start
+
+    # Unreachable: the searches always meet by d = max_d
+    raise RuntimeError("Myers diff failed to find a middle snake")
+
+
+def matching_blocks(a: Sequence, b: Sequence) -> List[Tuple[int, int, int]]:
+    """
+    Matching runs (a_index, b_index, length) of a shortest edit script,
+    in order. O((N+M)·D) time and O(N+M) space, where D is the edit distance.
+    """
+    blocks = []
+    stack = [(0, len(a), 0, len(b))]
+
+    while stack:
+        a_lo, a_hi, b_lo, b_hi = stack.pop()
+
+        # Common prefix and suffix are matched directly
+        prefix = 0
+        while a_lo + prefix < a_hi and b_lo + prefix < b_hi and a[a_lo + prefix] == b[b_lo + prefix]:
+            prefix += 1
+        if prefix:
+            blocks.append((a_lo, b_lo, prefix))
+            a_lo += prefix
+            b_lo += prefix
+
+        suffix = 0
+        while a_lo < a_hi - suffix and b_lo < b_hi - suffix and a[a_hi - 1 - suffix] == b[b_hi - 1 - suffix]:
+            suffix += 1
+        if suffix:
+            blocks.append((a_hi - suffix, b_hi - suffix, suffix))
+            a_hi -= suffix
+            b_hi -= suffix
+
+        if a_lo == a_hi or b_lo == b_hi:
+            continue
+
+        x_start, y_start, x_end, y_end = _middle_snake(a, a_lo, a_hi, b, b_lo, b_hi)
+        if x_end > x_start:
+            blocks.append((a_lo + x_start, b_lo + y_start, x_end - x_start))
+        stack.append((a_lo + x_end, a_hi, b_lo + y_end, b_hi))
+        stack.append((a_lo, a_lo + x_start, b_lo, b_lo + y_start))
+
+    blocks.sort()
+    return blocks
+
+
+def diff(a: Sequence, b: Sequence) -> List[Opcode]:
+    """Opcodes turning sequence a into sequence b (difflib-compatible tags)"""
+    opcodes = []
+    i = j = 0
+    for a_index, b_index, length in matching_blocks(a, b) + [(len(a), len(b), 0)]:
+        if i < a_index and j < b_index:
+            opcodes.append(("replace", i, a_index, j, b_index))
+        elif i < a_index:
+            opcodes.append(("delete", i, a_index, j, b_index))
+        elif j < b_index:
+            opcodes.append(("insert", i, a_index, j, b_index))
+        if length:
+            opcodes.append(("equal", a_index, a_index + length, b_index, b_index + length))
+        i, j = a_index + length, b_index + length
+    return opcodes
+
+
+def align(original: str, corrected: str, pattern: Optional[re.Pattern] = None) -> List[Dict]:
+    """
+    Token-level edits that turn `original` into `corrected`.
+
+    Each edit is a dict with "op" (replace/delete/insert), "offset" and
+    "length" (character span in `original`), "original_text" and
+    "replacement". Insertions are anchored to the preceding token (or the
+    following one at the start of the text), so every edit covers at
+    least one original token.
+    """
+    a, b = tokenize(original, pattern), tokenize(corrected, pattern)
+    edits = []
+
+    for tag, a_start, a_end, b_start, b_end in diff([t[0] for t in a], [t[0] for t in b]):
+        if tag == "equal":
+            continue
+
+        inserted = corrected[b[b_start][1]:b[b_end - 1][2]] if b_end > b_start else ""
+        if tag == "insert":
+            if not a:
+                continue
+            if a_start > 0:
+                anchor = a[a_start - 1]
+                replacement = f"{anchor[0]} {inserted}"
+            else:
+                anchor = a[0]
+                replacement = f"{inserted} {anchor[0]}"
+            start, end = anchor[1], anchor[2]
+        else:
+            start, end = a[a_start][1], a[a_end - 1][2]
+            replacement = inserted
+
+        edits.append({
+            "op": tag,
+            "offset": start,
+            "length": end - start,
+            "original_text": original[start:end],
+            "replacement": replacement
+        })
+    return edits
@@ -0,0 +1,145 @@
+"""
+Latency-Aware Circuit Breaker
+Tracks rolling p95 latency and error rate of a primary model path and tells
+callers when to divert traffic to a cheaper fallback.
+
+States:
+- closed: primary serves all traffic
+- open: primary is skipped until the cooldown has passed
+- half_open: one probe request goes to the primary; success closes the
+  circuit, failure or a slow response opens it again. Only the caller that
+  allow() handed the probe can resolve it; outcomes of other requests
+  (started while the circuit was still closed) are ignored unless closed
+
+Callers record the latency of the primary's own work (e.g. per sentence),
+not of the whole request, so the SLO does not depend on input size.
+"""
+import logging
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Circuit breaker driven by a rolling window of request outcomes"""
+
+    def __init__(
+        self,
+        name: str,
+        latency_slo_ms: float,
+        max_error_rate: float = 0.2,
+        window: int = 100,
+        min_samples: int = 20,
+        cooldown_s: float = 30.0
+    ):
+        self.name = name
+        self.latency_slo = latency_slo_ms / 1000.0
+        self.max_error_rate = max_error_rate
+        self.min_samples = max(1, min_samples)
+        self.cooldown = cooldown_s
+
+        self._latencies: deque = deque(maxlen=max(1, window))
+        self._failures: deque = deque(maxlen=max(1, window))
+        self._lock = threading.Lock()
+
+        self.state = "closed"
+        self._opened_at = 0.0
+        self._probing = False
+
+        # Statistics
+        self.trips = 0
+        self.diverted = 0
+
+    def allow(self) -> Tuple[bool, bool]:
+        """
+        Whether the next request may use the primary path.
+
+        Returns:
+            (allowed, probe): probe is True for the one request that holds the
+            half-open probe; it must pass probe=True to record() or release()
+        """
+        with self._lock:
+            if self.state == "closed":
+                return True, False
+            if self.state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = "half_open"
+            if self.state == "half_open" and not self._probing:
+                self._probing = True
+                logger.info(f"Circuit '{self.name}' half-open: probing primary")
+                return True, True
+            self.diverted += 1
+            return False, False
+
+    def record(self, latency_s: Optional[float], ok: bool, probe: bool = False):
+        """
+        Record the outcome of a request served by the primary path.
+        A failed request may pass latency_s=None (it only counts as an error).
+        The probe resolves the half-open state; other requests only count
+        while the circuit is closed.
+        """
+        with self._lock:
+            if probe:
+                if self.state != "half_open" or not self._probing:
+                    return
+                self._probing = False
+                if ok and latency_s is not None and latency_s <= self.latency_slo:
+                    self.state = "closed"
+                    self._latencies.clear()
+                    self._failures.clear()
+                    logger.info(f"✅ Circuit '{self.name}' closed: primary recovered ({latency_s * 1000:.0f} ms)")
+                else:
+                    self._open()
+                return
+
+            if self.state != "closed":
+                return
+            if latency_s is not None:
+                self._latencies.append(latency_s)
+            self._failures.append(0 if ok else 1)
+
+            if len(self._failures) >= self.min_samples:
+                p95 = self._p95() or 0.0
+                error_rate = sum(self._failures) / len(self._failures)
+                if p95 > self.latency_slo or error_rate > self.max_error_rate:
+                    logger.warning(
+                        f"Circuit '{self.name}' opened: p95 {p95 * 1000:.0f} ms "
+                        f"(SLO {self.latency_slo * 1000:.0f} ms), error rate {error_rate:.2f}"
+                    )
+                    self._open()
+
+    def release(self, probe: bool):
+        """End a half-open probe without an outcome (cancelled, or the primary did no work)"""
+        if not probe:
+            return
+        with self._lock:
+            if self.state == "half_open":
+                self._probing = False
+
+    def _open(self):
+        self.state = "open"
+        self._opened_at = time.monotonic()
+        self.trips += 1
+
+    def _p95(self) -> Optional[float]:
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[max(0, math.ceil(0.95 * len(ordered)) - 1)]
+
+    def stats(self) -> Dict:
+        """Breaker statistics for health endpoints"""
+        with self._lock:
+            p95 = self._p95()
+            return {
+                "state": self.state,
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+                "latency_slo_ms": self.latency_slo * 1000,
+                "error_rate": round(sum(self._failures) / len(self._failures), 4) if self._failures else 0.0,
+                "samples": len(self._failures),
+                "trips": self.trips,
+                "diverted": self.diverted
+            }
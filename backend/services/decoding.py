@@ -0,0 +1,60 @@
+"""
+Decoding Profiles
+Named generation settings (configured in config.DECODING_PROFILES) with
+length-adaptive generation budgets instead of a flat max_length.
+"""
+import logging
+import math
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def resolve_profile(name: Optional[str]) -> str:
+    """Return a configured profile name, falling back to the default profile"""
+    if name and name in settings.DECODING_PROFILES:
+        return name
+    if name:
+        logger.warning(f"Unknown decoding profile '{name}', using '{settings.DEFAULT_DECODING_PROFILE}'")
+    return settings.DEFAULT_DECODING_PROFILE
+
+
+def get_profile(name: Optional[str]) -> Dict:
+    return settings.DECODING_PROFILES[resolve_profile(name)]
+
+
+def num_beams(profile: Optional[str], task: str) -> int:
+    """Beam width of a profile for a task ("translation" or "grammar")"""
+    return int(get_profile(profile)[f"{task}_beams"])
+
+
+def max_new_tokens(profile: Optional[str], input_tokens: int) -> int:
+    """Generation budget that scales with the input length, capped at MAX_LENGTH"""
+    config = get_profile(profile)
+    budget = math.ceil(input_tokens * config["length_ratio"]) + int(config["length_margin"])
+    return max(1, min(settings.MAX_LENGTH, budget))
+
+
+def generation_kwargs(profile: Optional[str], task: str, input_tokens: int) -> Dict:
+    """Keyword arguments for model.generate under a profile"""
+    beams = num_beams(profile, task)
+    kwargs = {
+        "num_beams": beams,
+        "max_new_tokens": max_new_tokens(profile, input_tokens)
+    }
+    if beams > 1:
+        kwargs["early_stopping"] = True
+    return kwargs
+
+
+def signature(profile: Optional[str], task: str) -> str:
+    """Stable string form of a profile's settings, for cache keys"""
+    config = get_profile(profile)
+    return ",".join([
+        f"beams={num_beams(profile, task)}",
+        f"ratio={config['length_ratio']}",
+        f"margin={config['length_margin']}",
+        f"max={settings.MAX_LENGTH}"
+    ])
@@ -0,0 +1,102 @@
+"""
+Masked-LM Scoring (IndicBERT)
+Token plausibility from a masked language model, used as the cheap
+sentence-level error detector in front of mT5 and as the fallback checker
+when mT5 is unavailable.
+
+Tokens are always scored with the token itself masked (pseudo-likelihood):
+with the token visible, a masked LM mostly copies it back with high
+probability, wrong inflections included.
+"""
+from typing import List, Optional, Sequence, Tuple
+
+import torch
+
+# Sentence score used by the cascade detector; part of the grammar cache key
+DETECTOR_METHOD = "masked-min-prob"
+
+# (input ids with special tokens, positions to mask and score)
+MaskedSentence = Tuple[torch.Tensor, Sequence[int]]
+
+
+def sentence_error_scores(token_probs: List[List[float]]) -> List[float]:
+    """
+    Error likelihood per sentence: 1 - masked probability of its least
+    plausible token. A single out-of-place word is enough to flag the
+    sentence; a sentence with nothing to score gets 0.
+    """
+    return [1.0 - min(probs) if probs else 0.0 for probs in token_probs]
+
+
+def masked_token_scores(
+    model,
+    input_ids: torch.Tensor,
+    positions: List[int],
+    mask_token_id: int,
+    top_k: int = 3,
+    max_batch: int = 64
+) -> List[Tuple[float, List[int]]]:
+    """
+    Mask each position of one sentence in turn and score the original token
+    (see masked_batch_scores).
+
+    Args:
+        input_ids: 1-D token ids of the sentence (with special tokens)
+        positions: Indices to mask and score
+
+    Returns:
+        (probability of the original token, top k+1 predicted ids) per position;
+        one spare candidate because the original token is often among them
+    """
+    return masked_batch_scores(model, [(input_ids, positions)], mask_token_id, top_k=top_k, max_batch=max_batch)[0]
+
+
+def masked_batch_scores(
+    model,
+    sentences: List[MaskedSentence],
+    mask_token_id: int,
+    pad_token_id: Optional[int] = None,
+    top_k: int = 3,
+    max_batch: int = 64
+) -> List[List[Tuple[float, List[int]]]]:
+    """
+    Masked scores for the given positions of several sentences.
+
+    Every (sentence, position) pair becomes one copy of the sentence with
+    that position masked. Copies of all sentences are stacked and padded
+    into batches of `max_batch` rows, so short sentences share forward
+    passes instead of costing one pass each.
+
+    Returns:
+        Per sentence, (probability of the original token, top k+1 predicted ids)
+        per position
+    """
+    variants = [(s, position) for s, (_, positions) in enumerate(sentences) for position in positions]
+    results: List[List[Tuple[float, List[int]]]] = [[] for _ in sentences]
+    pad = mask_token_id if pad_token_id is None else pad_token_id
+
+    for i in range(0, len(variants), max_batch):
+        chunk = variants[i:i + max_batch]
+        device = sentences[chunk[0][0]][0].device
+        width = max(len(sentences[s][0]) for s, _ in chunk)
+        batch = torch.full((len(chunk), width), pad, dtype=torch.long, device=device)
+        attention_mask = torch.zeros((len(chunk), width), dtype=torch.long, device=device)
+        for row, (s, _) in enumerate(chunk):
+            ids = sentences[s][0]
+            batch[row, :len(ids)] = ids
+            attention_mask[row, :len(ids)] = 1
+
+        rows = torch.arange(len(chunk), device=device)
+        columns = torch.tensor([position for _, position in chunk], device=device)
+        originals = batch[rows, columns].clone()
+        batch[rows, columns] = mask_token_id
+
+        with torch.inference_mode():
+            logits = model(input_ids=batch, attention_mask=attention_mask).logits[rows, columns]
+        probs = torch.softmax(logits.float(), dim=-1)
+
+        original = probs.gather(-1, originals.unsqueeze(-1)).squeeze(-1).cpu().tolist()
+        candidates = probs.topk(top_k + 1, dim=-1).indices.cpu().tolist()
+        for (s, _), prob, top in zip(chunk, original, candidates):
+            results[s].append((prob, top))
+    return results
@@ -5,13 +5,31 @@ Fallback: IndicBERT (ai4bharat - Indian languages BERT)
 """
 import logging
 import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, AutoModelForMaskedLM, pipeline
-from typing import List, Dict, Optional
+from transformers import AutoTokenizer, AutoModelForMaskedLM, pipeline
+from typing import List, Dict, Optional, Tuple
 import asyncio
+import hashlib
 import re
+import threading
+import time
+
+from config import settings
+from services import decoding
+from services.inference import load_seq2seq_model
+from services.alignment import align, tokenize
+from services.cache import LRUCache, normalize_text
+from services.normalization import NormalizedText
+from services.circuit import CircuitBreaker
+from services.quantization import GRAMMAR_SAMPLES, apply_precision
+from services.segmentation import Span, sliding_windows, split_sentences
+from services.speculative import CopyProposer, SpeculativeStats, speculative_greedy
+from .mlm import DETECTOR_METHOD, masked_batch_scores, masked_token_scores, sentence_error_scores
 
 logger = logging.getLogger(__name__)
 
+# T5 special tokens that can leak into decoded corrections
+_SPECIAL_TOKEN_RE = re.compile(r'<extra_id_\d+>|<pad>|</s>|<unk>')
+
 class GrammarService:
     """
     Dedicated grammar checking service.
@@ -34,36 +52,76 @@ class GrammarService:
         # Models
         self.primary_model = None
         self.primary_tokenizer = None
+        self.primary_engine = settings.GRAMMAR_ENGINE
+        self.primary_precision = "fp32"
+        self.primary_precision_score: Optional[float] = None
         self.fallback_model = None
         self.fallback_tokenizer = None
         
         self.primary_ready = False
         self.fallback_ready = False
         
+        # Fast tokenizers are not safe to call from several threads at once
+        self._tokenizer_lock = threading.Lock()
+        
+        # Input-as-draft fast path statistics
+        self.copy_draft_stats = SpeculativeStats()
+        self.sentences_confirmed = 0  # Unchanged, confirmed by one teacher-forced pass
+        self.sentences_decoded = 0  # Needed decoding
+        
+        # Cascade statistics: IndicBERT detector in front of mT5
+        self.detector_sentences = 0  # Scored by the detector
+        self.detector_flagged = 0  # Sent on to mT5
+        
+        # mT5 latency / error tracking for the hot-standby mode
+        self.breaker = CircuitBreaker(
+            "grammar-mt5",
+            latency_slo_ms=settings.GRAMMAR_LATENCY_SLO_MS,
+            max_error_rate=settings.GRAMMAR_MAX_ERROR_RATE,
+            window=settings.GRAMMAR_BREAKER_WINDOW,
+            cooldown_s=settings.GRAMMAR_BREAKER_COOLDOWN_S
+        )
+        
+        # Sentence -> correction cache, so unchanged sentences of re-sent documents skip the models
+        self.cache: Optional[LRUCache] = None
+        if settings.GRAMMAR_CACHE_ENABLED:
+            self.cache = LRUCache(
+                max_entries=settings.GRAMMAR_CACHE_ENTRIES,
+                max_bytes=settings.GRAMMAR_CACHE_BYTES
+            )
+        
         logger.info(f"Grammar Service initialized")
         logger.info(f"Primary: {primary_model}")
         logger.info(f"Fallback: {fallback_model}")
         logger.info(f"Device: {self.device}")
     
-    async def load(self):
+    async def load(self, precision: Optional[str] = None):
         """Load grammar checking models"""
         # Try loading primary model (mT5)
         try:
             logger.info("Loading primary grammar model (mT5)...")
-            await self._load_primary()
+            await self._load_primary(precision)
         except Exception as e:
             logger.warning(f"Primary model failed to load: {e}")
         
-        # Try loading fallback model (IndicBERT)
-        if not self.primary_ready:
+        # Try loading fallback model (IndicBERT), also the cascade's detector and hot standby
+        if not self.primary_ready or settings.GRAMMAR_CASCADE or settings.GRAMMAR_HOT_STANDBY:
             try:
                 logger.info("Loading fallback grammar model (IndicBERT)...")
                 await self._load_fallback()
             except Exception as e:
                 logger.error(f"Fallback model failed to load: {e}")
     
-    async def _load_primary(self):
-        """Load mT5 model for grammar correction"""
+    async def _load_primary(self, precision: Optional[str] = None):
+        """
+        Load mT5 model for grammar correction.
+        
+        Args:
+            precision: "fp32", "int8" or "bf16" (defaults to settings.GRAMMAR_PRECISION).
+                Reduced precision is refused if corrections on the bundled
+                sample set drift too far from fp32.
+        """
+        precision = precision or settings.GRAMMAR_PRECISION
         loop = asyncio.get_event_loop()
         
         def load():
@@ -71,17 +129,32 @@ class GrammarService:
                 self.primary_model_name,
                 cache_dir=self.cache_dir
             )
-            model = AutoModelForSeq2SeqLM.from_pretrained(
+            model, engine = load_seq2seq_model(
                 self.primary_model_name,
-                cache_dir=self.cache_dir
+                cache_dir=self.cache_dir,
+                engine=settings.GRAMMAR_ENGINE,
+                device=self.device
             )
-            if self.device == "cuda":
-                model = model.to(self.device)
-            return tokenizer, model
+            return tokenizer, model, engine
+        
+        self.primary_tokenizer, self.primary_model, self.primary_engine = await loop.run_in_executor(None, load)
+        
+        if precision != "fp32":
+            if self.primary_engine == "torch":
+                def reduce():
+                    return apply_precision(
+                        self.primary_model,
+                        precision,
+                        lambda model: self._generate_corrections(model, GRAMMAR_SAMPLES, "interactive"),
+                        min_score=settings.QUANTIZATION_MIN_CHRF
+                    )
+                self.primary_model, self.primary_precision, self.primary_precision_score = \
+                    await loop.run_in_executor(None, reduce)
+            else:
+                logger.warning(f"{precision} precision is only supported with the torch engine")
         
-        self.primary_tokenizer, self.primary_model = await loop.run_in_executor(None, load)
         self.primary_ready = True
-        logger.info("✅ mT5 grammar model loaded!")
+        logger.info(f"✅ mT5 grammar model loaded! (engine: {self.primary_engine}, precision: {self.primary_precision})")
     
     async def _load_fallback(self):
         """Load IndicBERT model as fallback"""
@@ -104,119 +177,492 @@ class GrammarService:
         self.fallback_ready = True
         logger.info("✅ IndicBERT fallback model loaded!")
     
-    async def check_grammar(self, text: str) -> List[Dict]:
+    async def check_grammar(self, text: str, profile: Optional[str] = None) -> List[Dict]:
         """
         Check grammar using AI models.
         Uses mT5 if available, falls back to IndicBERT.
         NO hardcoded patterns - pure AI.
         """
+        return (await self.check_document(text, profile))["errors"]
+    
+    async def check_document(self, text: str, profile: Optional[str] = None) -> Dict:
+        """
+        Check grammar and report which model served the request.
+        
+        With GRAMMAR_HOT_STANDBY, a circuit breaker watches mT5 latency and
+        errors and diverts requests to IndicBERT while mT5 is over its SLO,
+        probing mT5 again after a cooldown.
+        
+        Models see the Bengali-normalized text, so encoding differences are
+        not reported as corrections; error offsets refer to the original text.
+        
+        Returns:
+            Dict with "errors" and "checked_by" ("mT5", "IndicBERT" or None)
+        """
         if not text or len(text.strip()) < 3:
-            return []
+            return {"errors": [], "checked_by": None}
+        
+        normalized = NormalizedText(text)
+        result = await self._check_normalized(normalized.text, profile)
+        if normalized.changed:
+            for error in result["errors"]:
+                start, end = normalized.span(error["offset"], error["offset"] + error["length"])
+                error.update(offset=start, length=end - start, original_text=text[start:end])
+        return result
+    
+    async def _check_normalized(self, text: str, profile: Optional[str] = None) -> Dict:
+        """Route a normalized document to mT5 or IndicBERT (see check_document)"""
+        standby = settings.GRAMMAR_HOT_STANDBY and self.fallback_ready
+        allowed, probe = self.primary_ready, False
+        if allowed and standby:
+            allowed, probe = self.breaker.allow()
+        if allowed:
+            try:
+                errors, sentence_latency = await self._run_mt5(text, profile)
+            except Exception as e:
+                self.breaker.record(None, ok=False, probe=probe)
+                logger.error(f"mT5 grammar check failed: {e}")
+                if not standby:
+                    return {"errors": [], "checked_by": "mT5"}
+            else:
+                if sentence_latency is not None:
+                    self.breaker.record(sentence_latency, ok=True, probe=probe)
+                return {"errors": errors, "checked_by": "mT5"}
+            finally:
+                # A cancelled probe, or one mT5 never worked on, must not leave the breaker half-open
+                self.breaker.release(probe)
+        
+        if self.fallback_ready:
+            return {"errors": await self._check_with_indicbert(text), "checked_by": "IndicBERT"}
+        
+        logger.warning("No grammar models available")
+        return {"errors": [], "checked_by": None}
+    
+    async def _run_mt5(self, text: str, profile: Optional[str] = None) -> Tuple[List[Dict], Optional[float]]:
+        """
+        mT5 grammar check (raises on failure).
+        The text is checked sentence by sentence in padded batches; sentences
+        longer than the window are checked as overlapping windows.
         
-        if self.primary_ready:
-            return await self._check_with_mt5(text)
-        elif self.fallback_ready:
-            return await self._check_with_indicbert(text)
-        else:
-            logger.warning("No grammar models available")
+        Returns:
+            (errors, mean mT5 seconds per corrected sentence, or None when
+            every sentence came from the cache or was passed by the cascade)
+        """
+        logger.info(f"Checking grammar with mT5: {len(text)} chars")
+        
+        loop = asyncio.get_event_loop()
+        errors, sentence_latency = await loop.run_in_executor(None, self._check_document_sync, text, profile)
+        
+        logger.info(f"mT5 found {len(errors)} grammar issues")
+        return errors, sentence_latency
+    
+    def _check_document_sync(self, text: str, profile: Optional[str] = None) -> Tuple[List[Dict], Optional[float]]:
+        """
+        Correct all windows of a document and map errors to document offsets (blocking).
+        Also returns the mean mT5 time per corrected sentence (see _run_mt5).
+        """
+        windows = self._plan_windows_sync(text)
+        
+        # Repeated sentences are corrected once
+        unique = list(dict.fromkeys(text[start:end] for (start, end), _ in windows))
+        
+        # Sentences unchanged since an earlier request come from the cache
+        corrections: Dict[str, str] = {}
+        cache_keys: Dict[str, str] = {}
+        if self.cache is not None:
+            for sentence in unique:
+                cache_keys[sentence] = self._cache_key(sentence, profile)
+                cached = self.cache.get(cache_keys[sentence])
+                if cached is not None:
+                    corrections[sentence] = cached
+            unique = [sentence for sentence in unique if sentence not in corrections]
+        
+        # Cascade: only sentences the detector flags go to mT5
+        pending = unique
+        if pending and self._cascade_active():
+            scores = self._detect_errors_sync(pending)
+            flagged = [
+                sentence for sentence, score in zip(pending, scores)
+                if score >= settings.GRAMMAR_CASCADE_THRESHOLD
+            ]
+            self.detector_sentences += len(pending)
+            self.detector_flagged += len(flagged)
+            corrections.update((sentence, sentence) for sentence in pending)
+            pending = flagged
+        
+        # Only mT5's own work is timed, per sentence, so the breaker's SLO does not scale with document size
+        sentence_latency = None
+        if pending:
+            started = time.perf_counter()
+            corrections.update(zip(pending, self._correct_batched(pending, profile)))
+            sentence_latency = (time.perf_counter() - started) / len(pending)
+        
+        if self.cache is not None:
+            for sentence in unique:
+                self.cache.put(cache_keys[sentence], corrections[sentence])
+        
+        # Errors are recomputed against the current text, so cached corrections land at current offsets
+        errors = []
+        for (start, end), (own_start, own_end) in windows:
+            window = text[start:end]
+            for error in self._compare_texts(window, corrections[window]):
+                error["offset"] += start
+                # Overlapping windows: keep each error from the window that owns its position
+                if own_start <= error["offset"] < own_end:
+                    errors.append(error)
+        return errors, sentence_latency
+    
+    def _cascade_active(self) -> bool:
+        return settings.GRAMMAR_CASCADE and self.fallback_ready
+    
+    def _cache_key(self, sentence: str, profile: Optional[str]) -> str:
+        """Cache key: normalized sentence + everything that can change its correction"""
+        cascade = (
+            f"cascade={DETECTOR_METHOD}@{settings.GRAMMAR_CASCADE_THRESHOLD}" if self._cascade_active() else "cascade=off"
+        )
+        raw = "\x1f".join((
+            normalize_text(sentence),
+            f"{self.primary_model_name}@{self.primary_precision}",
+            decoding.signature(profile, "grammar"),
+            cascade,
+            f"copy_draft={settings.GRAMMAR_COPY_DRAFT}"
+        ))
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+    
+    def _detect_errors_sync(self, texts: List[str]) -> List[float]:
+        """
+        IndicBERT error likelihood (0-1) per sentence from masked scores of
+        every token; the masked variants of all sentences are batched
+        together, GRAMMAR_FALLBACK_MAX_VARIANTS rows per pass (blocking).
+        """
+        with self._tokenizer_lock:
+            encoded = self.fallback_tokenizer(
+                texts,
+                truncation=True,
+                max_length=settings.MAX_LENGTH,
+                return_special_tokens_mask=True
+            )
+        
+        # Similar lengths next to each other, so batches carry little padding
+        order = sorted(range(len(texts)), key=lambda i: len(encoded["input_ids"][i]))
+        sentences = []
+        for i in order:
+            special = encoded["special_tokens_mask"][i]
+            positions = [p for p, is_special in enumerate(special) if not is_special]
+            sentences.append((torch.tensor(encoded["input_ids"][i], device=self.device), positions))
+        
+        results = masked_batch_scores(
+            self.fallback_model,
+            sentences,
+            self.fallback_tokenizer.mask_token_id,
+            pad_token_id=self.fallback_tokenizer.pad_token_id,
+            top_k=0,
+            max_batch=settings.GRAMMAR_FALLBACK_MAX_VARIANTS
+        )
+        token_probs = [[prob for prob, _ in scores] for scores in results]
+        
+        scores = [0.0] * len(texts)
+        for i, score in zip(order, sentence_error_scores(token_probs)):
+            scores[i] = score
+        return scores
+    
+    def _plan_windows_sync(self, text: str) -> List[Tuple[Span, Span]]:
+        """Sentence spans, with over-long sentences split into overlapping windows"""
+        budget = self._window_budget()
+        sentences = split_sentences(text)
+        counts = self._count_tokens([text[start:end] for start, end in sentences])
+        
+        windows = []
+        for span, count in zip(sentences, counts):
+            if count <= budget:
+                windows.append((span, span))
+            else:
+                windows.extend(sliding_windows(
+                    text, span, self._count_tokens, budget, settings.GRAMMAR_WINDOW_OVERLAP
+                ))
+        return windows
+    
+    def _window_budget(self) -> int:
+        """Token budget per window, leaving room for the prompt prefix and EOS"""
+        prefix = self._count_tokens(["grammar:"])[0]
+        return max(1, min(settings.GRAMMAR_WINDOW_TOKENS, settings.MAX_LENGTH - prefix - 1))
+    
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Token counts without special tokens"""
+        if not texts:
             return []
+        with self._tokenizer_lock:
+            encoded = self.primary_tokenizer(texts, add_special_tokens=False)
+        return [len(ids) for ids in encoded["input_ids"]]
     
-    async def _check_with_mt5(self, text: str) -> List[Dict]:
-        """Use mT5 for grammar checking"""
-        try:
-            logger.info(f"Checking grammar with mT5: {text}")
-            
-            loop = asyncio.get_event_loop()
+    def _correct_batched(self, texts: List[str], profile: Optional[str] = None) -> List[str]:
+        """
+        Correct texts in padded batches of similar length (blocking).
+        
+        With GRAMMAR_COPY_DRAFT (torch engine) and a greedy profile, each
+        batch is first checked in one teacher-forced pass with the input as
+        the draft output; sentences greedy decoding would copy unchanged are
+        done. A single remaining sentence uses input-as-draft speculative
+        decoding; several go through padded generation, which beats decoding
+        them one by one. Beam profiles always run normal beam search, since
+        beam search can correct a sentence that greedy decoding would copy.
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+        corrected: List[Optional[str]] = [None] * len(texts)
+        batch_size = max(1, settings.BATCH_SIZE)
+        
+        pending = order
+        if (
+            settings.GRAMMAR_COPY_DRAFT
+            and self.primary_engine == "torch"
+            and decoding.num_beams(profile, "grammar") == 1
+        ):
+            for i in range(0, len(order), batch_size):
+                batch = order[i:i + batch_size]
+                for j, unchanged in zip(batch, self._confirm_unchanged([texts[j] for j in batch])):
+                    if unchanged:
+                        corrected[j] = texts[j]
+            pending = [j for j in order if corrected[j] is None]
+            self.sentences_confirmed += len(order) - len(pending)
             
-            def check_sync():
-                # Create prompt for grammar checking
-                prompt = f"grammar: {text}"
-                
-                inputs = self.primary_tokenizer(
-                    prompt,
-                    return_tensors="pt",
-                    max_length=512,
-                    truncation=True
-                )
-                
-                if self.device == "cuda":
-                    inputs = {k: v.to(self.device) for k, v in inputs.items()}
-                
-                # Generate correction
-                outputs = self.primary_model.generate(
-                    **inputs,
-                    max_length=512,
-                    num_beams=4,
-                    early_stopping=True
-                )
-                
-                corrected = self.primary_tokenizer.decode(outputs[0], skip_special_tokens=True)
+            if len(pending) == 1:
+                corrected[pending[0]] = self._correct_speculative(texts[pending[0]], profile)
+                self.sentences_decoded += 1
                 return corrected
+        
+        self.sentences_decoded += len(pending)
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            outputs = self._generate_corrections(self.primary_model, [texts[j] for j in batch], profile)
+            for j, output in zip(batch, outputs):
+                corrected[j] = output
+        return corrected
+    
+    def _confirm_unchanged(self, texts: List[str]) -> List[bool]:
+        """
+        Whether greedy correction would reproduce each text unchanged,
+        checked in one forward pass with the text as decoder input (blocking).
+        """
+        with self._tokenizer_lock:
+            inputs = self.primary_tokenizer(
+                [f"grammar: {text}" for text in texts],
+                return_tensors="pt",
+                padding=True,
+                max_length=settings.MAX_LENGTH,
+                truncation=True
+            )
+            targets = self.primary_tokenizer(
+                texts,
+                return_tensors="pt",
+                padding=True,
+                max_length=settings.MAX_LENGTH,
+                truncation=True
+            )
+        
+        labels = targets["input_ids"]
+        start = torch.full((labels.shape[0], 1), self.primary_model.config.decoder_start_token_id, dtype=labels.dtype)
+        decoder_input_ids = torch.cat([start, labels[:, :-1]], dim=1)
+        
+        if self.device == "cuda":
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+            decoder_input_ids = decoder_input_ids.to(self.device)
+        
+        with torch.inference_mode():
+            logits = self.primary_model(**inputs, decoder_input_ids=decoder_input_ids).logits
+        
+        # Every target token (including EOS) must be the model's argmax; padding is ignored
+        matches = (logits.argmax(-1).cpu() == labels) | (targets["attention_mask"] == 0)
+        return matches.all(dim=1).tolist()
+    
+    def _correct_speculative(self, text: str, profile: Optional[str] = None) -> str:
+        """
+        Greedy correction of one text with its own tokens as the draft:
+        copied stretches are verified many tokens per forward pass, and
+        decoding only proceeds token by token where the output diverges.
+        """
+        with self._tokenizer_lock:
+            inputs = self.primary_tokenizer(
+                [f"grammar: {text}"],
+                return_tensors="pt",
+                max_length=settings.MAX_LENGTH,
+                truncation=True
+            )
+            source = self.primary_tokenizer(text, max_length=settings.MAX_LENGTH, truncation=True)["input_ids"]
+        
+        if self.device == "cuda":
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        
+        config = self.primary_model.config
+        with torch.inference_mode():
+            sequence = speculative_greedy(
+                self.primary_model,
+                inputs["input_ids"],
+                inputs["attention_mask"],
+                [config.decoder_start_token_id],
+                CopyProposer(source),
+                max_new_tokens=decoding.max_new_tokens(profile, inputs["input_ids"].shape[1]),
+                eos_token_id=config.eos_token_id,
+                num_draft_tokens=settings.GRAMMAR_DRAFT_TOKENS,
+                stats=self.copy_draft_stats
+            )
+        
+        return self.primary_tokenizer.decode(sequence, skip_special_tokens=True)
+    
+    def _generate_corrections(self, model, texts: List[str], profile: Optional[str] = None) -> List[str]:
+        """Run mT5 correction on a batch of texts under a decoding profile (blocking)"""
+        # Create prompts for grammar checking
+        prompts = [f"grammar: {text}" for text in texts]
+        
+        with self._tokenizer_lock:
+            inputs = self.primary_tokenizer(
+                prompts,
+                return_tensors="pt",
+                padding=True,
+                max_length=settings.MAX_LENGTH,
+                truncation=True
+            )
+        
+        if self.device == "cuda":
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        
+        # Generate corrections
+        with torch.inference_mode():
+            outputs = model.generate(
+                **inputs,
+                **decoding.generation_kwargs(profile, "grammar", inputs["input_ids"].shape[1])
+            )
+        
+        return self.primary_tokenizer.batch_decode(outputs, skip_special_tokens=True)
+    
+    async def _check_with_indicbert(self, text: str) -> List[Dict]:
+        """
+        Use IndicBERT for grammar detection (degraded mode without mT5).
+        Every token is masked in turn and scored; words whose token the
+        masked LM finds implausible are flagged with its top-k replacements.
+        """
+        try:
+            logger.info(f"Checking grammar with IndicBERT: {len(text)} chars")
             
-            corrected_text = await loop.run_in_executor(None, check_sync)
+            loop = asyncio.get_event_loop()
+            errors = await loop.run_in_executor(None, self._indicbert_check_sync, text)
             
-            # Compare original and corrected to find errors
-            errors = self._compare_texts(text, corrected_text)
-            logger.info(f"mT5 found {len(errors)} grammar issues")
+            logger.info(f"IndicBERT found {len(errors)} grammar issues")
             return errors
-            
         except Exception as e:
-            logger.error(f"mT5 grammar check failed: {e}")
+            logger.error(f"IndicBERT grammar check failed: {e}")
             return []
     
-    async def _check_with_indicbert(self, text: str) -> List[Dict]:
-        """Use IndicBERT for grammar detection"""
-        try:
-            logger.info(f"Checking grammar with IndicBERT: {text}")
-            # IndicBERT for masked language modeling - can detect anomalies
-            # This is a simplified implementation
-            return []
-        except Exception as e:
-            logger.error(f"IndicBERT grammar check failed: {e}")
+    def _indicbert_check_sync(self, text: str) -> List[Dict]:
+        """Masked-LM scoring of every sentence (blocking)"""
+        errors = []
+        for start, end in split_sentences(text):
+            errors.extend(self._indicbert_sentence_errors(text[start:end], start))
+        return errors
+    
+    def _indicbert_sentence_errors(self, sentence: str, base_offset: int) -> List[Dict]:
+        """Flag implausible tokens of one sentence, one error per affected word"""
+        with self._tokenizer_lock:
+            encoded = self.fallback_tokenizer(
+                sentence,
+                return_tensors="pt",
+                truncation=True,
+                max_length=settings.MAX_LENGTH,
+                return_offsets_mapping=True,
+                return_special_tokens_mask=True
+            )
+        
+        input_ids = encoded["input_ids"][0].to(self.device)
+        offsets = encoded["offset_mapping"][0].tolist()
+        positions = [
+            i for i, special in enumerate(encoded["special_tokens_mask"][0].tolist())
+            if not special and offsets[i][1] > offsets[i][0]
+        ]
+        if not positions:
             return []
+        
+        scores = masked_token_scores(
+            self.fallback_model,
+            input_ids,
+            positions,
+            self.fallback_tokenizer.mask_token_id,
+            top_k=settings.GRAMMAR_FALLBACK_TOP_K,
+            max_batch=settings.GRAMMAR_FALLBACK_MAX_VARIANTS
+        )
+        
+        # Keep the least plausible flagged token of each word
+        words = tokenize(sentence)
+        flagged: Dict[int, Tuple[float, int, List[int]]] = {}
+        for position, (prob, candidates) in zip(positions, scores):
+            if prob >= settings.GRAMMAR_FALLBACK_THRESHOLD:
+                continue
+            word_index = next(
+                (w for w, (_, w_start, w_end) in enumerate(words) if w_start < offsets[position][1] <= w_end),
+                None
+            )
+            if word_index is not None and (word_index not in flagged or prob < flagged[word_index][0]):
+                flagged[word_index] = (prob, position, candidates)
+        
+        errors = []
+        for word_index, (prob, position, candidates) in sorted(flagged.items()):
+            word, w_start, w_end = words[word_index]
+            # Some tokenizers include the preceding space in a piece's offsets
+            piece_start, piece_end = max(0, offsets[position][0] - w_start), offsets[position][1] - w_start
+            original_piece = word[piece_start:piece_end]
+            
+            suggestions = []
+            for candidate in candidates:
+                if candidate in self.fallback_tokenizer.all_special_ids:
+                    continue
+                piece = self.fallback_tokenizer.decode([candidate]).strip()
+                if piece and piece != original_piece and any(c.isalpha() for c in piece):
+                    suggestions.append(word[:piece_start] + piece + word[piece_end:])
+            suggestions = suggestions[:settings.GRAMMAR_FALLBACK_TOP_K]
+            if not suggestions:
+                continue
+            
+            errors.append({
+                "type": "grammar",
+                "offset": base_offset + w_start,
+                "length": w_end - w_start,
+                "original_text": word,
+                "suggestions": suggestions,
+                "message": "ব্যাকরণ ত্রুটি পাওয়া গেছে",
+                "reason": f"IndicBERT পরামর্শ: '{suggestions[0]}' ব্যবহার করুন।",
+                "confidence": 0.70
+            })
+        return errors
     
     def _compare_texts(self, original: str, corrected: str) -> List[Dict]:
         """
         Compare original and corrected text to identify errors.
-        Uses diff algorithm to find specific changes.
+        Token-level diff (services.alignment), so insertions and deletions
+        do not shift later words into false errors.
         Filters out T5 special tokens like <extra_id_0>
         """
         # Filter out T5 special tokens from corrected text
-        import re
-        corrected = re.sub(r'<extra_id_\d+>', '', corrected).strip()
-        corrected = re.sub(r'<pad>', '', corrected).strip()
-        corrected = re.sub(r'</s>', '', corrected).strip()
-        corrected = re.sub(r'<unk>', '', corrected).strip()
+        corrected = _SPECIAL_TOKEN_RE.sub('', corrected).strip()
         
         if original == corrected or not corrected:
             return []
         
         errors = []
-        
-        # Simple word-level comparison
-        original_words = original.split()
-        corrected_words = corrected.split()
-        
-        # Find differences
-        for i, (orig, corr) in enumerate(zip(original_words, corrected_words)):
-            if orig != corr:
-                # Skip if correction is empty or a special token
-                if not corr or corr.startswith('<'):
-                    continue
-                
-                # Calculate offset
-                offset = len(' '.join(original_words[:i])) + (1 if i > 0 else 0)
-                
-                errors.append({
-                    "type": "grammar",
-                    "offset": offset,
-                    "length": len(orig),
-                    "original_text": orig,
-                    "suggestions": [corr],
-                    "message": "ব্যাকরণ ত্রুটি পাওয়া গেছে",
-                    "reason": f"AI পরামর্শ: '{corr}' ব্যবহার করুন।",
-                    "confidence": 0.90
-                })
+        for edit in align(original, corrected):
+            replacement = edit["replacement"]
+            if edit["op"] == "delete":
+                reason = f"AI পরামর্শ: '{edit['original_text']}' বাদ দিন।"
+            else:
+                reason = f"AI পরামর্শ: '{replacement}' ব্যবহার করুন।"
+            
+            errors.append({
+                "type": "grammar",
+                "offset": edit["offset"],
+                "length": edit["length"],
+                "original_text": edit["original_text"],
+                "suggestions": [replacement],
+                "message": "ব্যাকরণ ত্রুটি পাওয়া গেছে",
+                "reason": reason,
+                "confidence": 0.90
+            })
         
         return errors
     
@@ -4,9 +4,10 @@ Dedicated endpoint for mT5/IndicBERT grammar service
 """
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 import logging
 
+from config import settings
 from .model import get_grammar_service
 
 router = APIRouter()
@@ -24,10 +25,11 @@ class GrammarError(BaseModel):
 
 class GrammarCheckRequest(BaseModel):
     text: str
+    profile: Optional[str] = None  # Decoding profile: "interactive", "balanced", "quality"
 
 class GrammarCheckResponse(BaseModel):
     errors: List[GrammarError]
-    checked_by: str  # "mT5" or "IndicBERT"
+    checked_by: Optional[str] = None  # Path that served the request: "mT5" or "IndicBERT"
 
 @router.post("/check-grammar", response_model=GrammarCheckResponse)
 async def check_grammar(request: GrammarCheckRequest):
@@ -45,14 +47,11 @@ async def check_grammar(request: GrammarCheckRequest):
                 detail="Grammar service not ready. Models still loading."
             )
         
-        errors = await service.check_grammar(request.text)
-        
-        # Determine which model was used
-        model_used = "mT5" if service.primary_ready else "IndicBERT"
+        result = await service.check_document(request.text, profile=request.profile)
         
         return GrammarCheckResponse(
-            errors=errors,
-            checked_by=model_used
+            errors=result["errors"],
+            checked_by=result["checked_by"]
         )
     
     except HTTPException:
@@ -69,6 +68,24 @@ async def grammar_health():
         "service": "grammar",
         "primary_model": service.primary_model_name,
         "primary_ready": service.primary_ready,
+        "primary_engine": service.primary_engine,
+        "primary_precision": service.primary_precision,
+        "hot_standby": settings.GRAMMAR_HOT_STANDBY and service.fallback_ready,
+        "circuit": service.breaker.stats(),
+        "cache": service.cache.stats() if service.cache else None,
+        "cascade": {
+            "enabled": settings.GRAMMAR_CASCADE and service.fallback_ready,
+            "threshold": settings.GRAMMAR_CASCADE_THRESHOLD,
+            "detector_sentences": service.detector_sentences,
+            "detector_flagged": service.detector_flagged,
+            "detector_passed": service.detector_sentences - service.detector_flagged
+        },
+        "copy_draft": {
+            "enabled": settings.GRAMMAR_COPY_DRAFT,
+            "sentences_confirmed": service.sentences_confirmed,
+            "sentences_decoded": service.sentences_decoded,
+            "speculative": service.copy_draft_stats.as_dict()
+        },
         "fallback_model": service.fallback_model_name,
         "fallback_ready": service.fallback_ready,
         "status": "healthy" if (service.primary_ready or service.fallback_ready) else "loading"
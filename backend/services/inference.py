@@ -0,0 +1,88 @@
+"""
+Seq2seq Inference Engines
+Loads NLLB / mT5 checkpoints either as eager PyTorch models or as
+ONNX Runtime sessions (encoder + decoder-with-past, KV cached).
+Both expose the same `generate()` API, so callers do not change.
+"""
+import logging
+import os
+from typing import Any, Tuple
+
+logger = logging.getLogger(__name__)
+
+ENGINES = ("torch", "onnx")
+
+
+def onnx_export_dir(model_name: str, cache_dir: str) -> str:
+    """Directory holding the exported ONNX graphs for a checkpoint"""
+    return os.path.join(cache_dir, "onnx", model_name.replace("/", "--"))
+
+
+def _load_torch(model_name: str, cache_dir: str, device: str):
+    from transformers import AutoModelForSeq2SeqLM
+
+    model = AutoModelForSeq2SeqLM.from_pretrained(
+        model_name,
+        cache_dir=cache_dir
+    )
+    if device == "cuda":
+        model = model.to(device)
+    return model
+
+
+def _load_onnx(model_name: str, cache_dir: str, device: str):
+    from optimum.onnxruntime import ORTModelForSeq2SeqLM
+
+    provider = "CUDAExecutionProvider" if device == "cuda" else "CPUExecutionProvider"
+    export_dir = onnx_export_dir(model_name, cache_dir)
+
+    if os.path.exists(os.path.join(export_dir, "config.json")):
+        logger.info(f"Loading cached ONNX export from {export_dir}")
+        return ORTModelForSeq2SeqLM.from_pretrained(
+            export_dir,
+            use_cache=True,
+            provider=provider
+        )
+
+    # First run: export encoder, decoder and decoder-with-past, then cache them
+    logger.info(f"Exporting {model_name} to ONNX (one-time, may take a few minutes)...")
+    model = ORTModelForSeq2SeqLM.from_pretrained(
+        model_name,
+        export=True,
+        use_cache=True,
+        cache_dir=cache_dir,
+        provider=provider
+    )
+    model.save_pretrained(export_dir)
+    logger.info(f"✅ ONNX export cached at {export_dir}")
+    return model
+
+
+def load_seq2seq_model(
+    model_name: str,
+    cache_dir: str = "./models",
+    engine: str = "torch",
+    device: str = "cpu"
+) -> Tuple[Any, str]:
+    """
+    Load a seq2seq model with the requested engine (blocking; run in executor).
+
+    Falls back to PyTorch if ONNX Runtime is not installed or export fails.
+
+    Returns:
+        (model, engine actually used)
+    """
+    if engine not in ENGINES:
+        logger.warning(f"Unknown inference engine '{engine}', using torch")
+        engine = "torch"
+
+    if engine == "onnx":
+        try:
+            return _load_onnx(model_name, cache_dir, device), "onnx"
+        except ImportError as e:
+            logger.warning(f"ONNX Runtime not available ({e}), using torch")
+            logger.warning("Install with: pip install optimum[onnxruntime]")
+        except Exception as e:
+            logger.warning(f"ONNX engine failed for {model_name}: {e}. Using torch")
+
+    return _load_torch(model_name, cache_dir, device), "torch"
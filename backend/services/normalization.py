@@ -0,0 +1,137 @@
+"""
+Bengali Unicode Normalization
+Canonical forms of Bengali text for cache keys, dictionary lookups and
+model input, so words that look identical but are encoded differently
+compare equal.
+
+Folding (on top of NFC):
+- য় / ড় / ঢ়: precomposed and base + nukta both become base + nukta (NFC form)
+- khanda ta: ত + hasanta + ZWJ (Unicode 4.0 encoding) becomes ৎ
+- ZWJ / ZWNJ are dropped (they only select glyph shapes)
+- repeated hasanta collapses to one
+- অ + া becomes আ
+- a nukta typed after a vowel sign moves back onto its consonant
+
+No rule crosses whitespace, so word tokens keep their positions.
+NormalizedText maps spans of the normalized text back to the original.
+"""
+import re
+import unicodedata
+from typing import List, Tuple
+
+# Bump whenever the folding rules change: lexicon snapshots built with another
+# version hold differently normalized words and are rebuilt
+NORMALIZATION_VERSION = 1
+
+_ZWJ = "\u200D"
+_ZWNJ = "\u200C"
+_HASANTA = "\u09CD"
+_NUKTA = "\u09BC"
+
+_KHANDA_TA_RE = re.compile("\u09A4\u09CD\u200D")
+_JOINERS_RE = re.compile("[\u200C\u200D]")
+_HASANTA_RUN_RE = re.compile("\u09CD{2,}")
+_VOWEL_SIGN_NUKTA_RE = re.compile("([\u09BE-\u09CC\u09D7])\u09BC")
+_SPLIT_AA = "\u0985\u09BE"
+
+# Text containing none of these and already in NFC needs no folding
+_FOLD_CHARS = frozenset((_ZWJ, _ZWNJ, _HASANTA, _NUKTA, "\u0985"))
+
+_CHUNK_RE = re.compile(r'\S+|\s+')
+
+
+def _fold(text: str) -> str:
+    text = unicodedata.normalize("NFC", text)
+    text = _KHANDA_TA_RE.sub("\u09CE", text)
+    text = _JOINERS_RE.sub("", text)
+    text = _HASANTA_RUN_RE.sub(_HASANTA, text)
+    text = text.replace(_SPLIT_AA, "\u0986")
+    text = _VOWEL_SIGN_NUKTA_RE.sub(_NUKTA + r"\1", text)
+    # Removing joiners can bring composable characters together (ে + া -> ো)
+    return unicodedata.normalize("NFC", text)
+
+
+def normalize(text: str) -> str:
+    """Canonical form of Bengali text (see module docstring)"""
+    if text.isascii():
+        return text
+    if unicodedata.is_normalized("NFC", text) and _FOLD_CHARS.isdisjoint(text):
+        return text
+    return _fold(text)
+
+
+class NormalizedText:
+    """
+    Normalized text with a map back to offsets in the original.
+
+    Characters merged or dropped by normalization map to the whole original
+    cluster they came from, so a span never cuts through a cluster.
+    """
+
+    def __init__(self, original: str):
+        self.original = original
+        self.text = normalize(original)
+        self.changed = self.text != original
+        # Normalized position -> original position, for span starts and span ends
+        self._starts: List[int] = []
+        self._ends: List[int] = []
+        if self.changed:
+            self._build_map()
+
+    def _build_map(self):
+        for match in _CHUNK_RE.finditer(self.original):
+            chunk = match.group(0)
+            folded = normalize(chunk)
+            if folded == chunk:
+                syncs = [(j, j) for j in range(len(chunk) + 1)]
+            else:
+                syncs = _sync_points(chunk, folded)
+            chunk_starts, chunk_ends = _cluster_bounds(syncs, len(folded))
+            self._starts.extend(match.start() + j for j in chunk_starts)
+            self._ends.extend(match.start() + j for j in chunk_ends)
+
+    def span(self, start: int, end: int) -> Tuple[int, int]:
+        """Original (start, end) of the normalized span [start, end)"""
+        if not self.changed:
+            return start, end
+        start = self._starts[start] if start < len(self.text) else len(self.original)
+        if end <= 0:
+            return start, start
+        # The span ends where the cluster holding its last character ends
+        end = self._ends[end - 1] if end <= len(self.text) else len(self.original)
+        return start, max(start, end)
+
+    def __str__(self) -> str:
+        return self.text
+
+
+def _sync_points(chunk: str, folded: str) -> List[Tuple[int, int]]:
+    """
+    (original, normalized) positions where the chunk can be cut and each
+    side normalizes independently. Quadratic, but only run on words that
+    actually change.
+    """
+    syncs = []
+    for j in range(len(chunk) + 1):
+        head = normalize(chunk[:j])
+        if folded.startswith(head) and normalize(chunk[j:]) == folded[len(head):]:
+            syncs.append((j, len(head)))
+    return syncs
+
+
+def _cluster_bounds(syncs: List[Tuple[int, int]], length: int) -> Tuple[List[int], List[int]]:
+    """
+    For each normalized character: original start and end of the cluster
+    holding it (the nearest sync points before and after it)
+    """
+    starts, ends = [], []
+    index = 0
+    for i in range(length):
+        while index + 1 < len(syncs) and syncs[index + 1][1] <= i:
+            index += 1
+        following = index
+        while syncs[following][1] <= i:
+            following += 1
+        starts.append(syncs[index][0])
+        ends.append(syncs[following][0])
+    return starts, ends
@@ -0,0 +1,220 @@
+"""
+Text Segmentation Utilities
+Sentence splitting, script-run splitting, token-budgeted chunking and
+offset-preserving reassembly shared by the AI services.
+"""
+import re
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+Span = Tuple[int, int]
+
+# Unicode blocks per script (ISO 15924 codes, as used in NLLB language codes)
+SCRIPT_RANGES = {
+    "Beng": [(0x0980, 0x09FF)],
+    "Latn": [(0x0041, 0x005A), (0x0061, 0x007A), (0x00C0, 0x024F)],
+    "Deva": [(0x0900, 0x097F)],
+    "Arab": [(0x0600, 0x06FF), (0x0750, 0x077F)],
+}
+
+# Danda / double danda sit in the Devanagari block but end Bengali sentences too
+_SHARED_MARKS = {"\u0964", "\u0965"}
+
+# Sentence terminators: . ? ! and the Bengali dari (।), optionally followed by
+# closing quotes/brackets, and then whitespace or end of text
+_SENTENCE_END_RE = re.compile(r'[.?!।॥]+[)\]"\'’”]*(?=\s|$)')
+_LINE_RE = re.compile(r'[^\n]+')
+_WORD_RE = re.compile(r'\S+')
+
+
+def _strip_span(text: str, start: int, end: int) -> Span:
+    """Shrink a span so it does not begin or end with whitespace"""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def split_sentences(text: str) -> List[Span]:
+    """
+    Split text into sentence spans (start, end).
+    Line breaks always end a sentence. Whitespace between sentences
+    is not part of any span, so it can be restored verbatim.
+    """
+    spans = []
+    for line in _LINE_RE.finditer(text):
+        start = line.start()
+        for match in _SENTENCE_END_RE.finditer(text, line.start(), line.end()):
+            span = _strip_span(text, start, match.end())
+            if span[0] < span[1]:
+                spans.append(span)
+            start = match.end()
+
+        span = _strip_span(text, start, line.end())
+        if span[0] < span[1]:
+            spans.append(span)
+    return spans
+
+
+def char_script(char: str) -> Optional[str]:
+    """
+    Script code of a letter, "Zzzz" for letters of other scripts, or None
+    for script-neutral characters (whitespace, digits, punctuation, dandas).
+    """
+    if char in _SHARED_MARKS:
+        return None
+    code = ord(char)
+    for script, ranges in SCRIPT_RANGES.items():
+        if any(low <= code <= high for low, high in ranges):
+            return script
+    return "Zzzz" if char.isalpha() else None
+
+
+def split_script_runs(text: str) -> List[Tuple[int, int, str]]:
+    """
+    Split code-mixed text into single-script runs (start, end, script).
+
+    Neutral characters between letters of the same script belong to the
+    run, so a run can span several sentences or lines. Punctuation and
+    digits touching a run (no whitespace in between) are attached to it.
+    Whitespace between runs is not part of any run.
+    """
+    runs = []
+    for i, char in enumerate(text):
+        script = char_script(char)
+        if script is None:
+            continue
+        if runs and runs[-1][2] == script:
+            runs[-1][1] = i + 1
+        else:
+            runs.append([i, i + 1, script])
+
+    for index, run in enumerate(runs):
+        limit = runs[index + 1][0] if index + 1 < len(runs) else len(text)
+        while run[1] < limit and not text[run[1]].isspace():
+            run[1] += 1
+    for index, run in enumerate(runs):
+        limit = runs[index - 1][1] if index else 0
+        while run[0] > limit and not text[run[0] - 1].isspace():
+            run[0] -= 1
+
+    return [(start, end, script) for start, end, script in runs]
+
+
+def split_to_budget(
+    text: str,
+    spans: Sequence[Span],
+    count_tokens: Callable[[List[str]], List[int]],
+    budget: int
+) -> List[Span]:
+    """
+    Split spans that exceed the token budget at word boundaries.
+    `count_tokens` maps a list of strings to their token counts.
+    Spans that already fit are returned unchanged.
+    """
+    if not spans:
+        return []
+
+    counts = count_tokens([text[s:e] for s, e in spans])
+    result = []
+
+    for (start, end), count in zip(spans, counts):
+        if count <= budget:
+            result.append((start, end))
+            continue
+
+        words = [m.span() for m in _WORD_RE.finditer(text, start, end)]
+        word_counts = count_tokens([text[s:e] for s, e in words])
+
+        piece_start, piece_end, piece_tokens = words[0][0], words[0][0], 0
+        for (w_start, w_end), w_count in zip(words, word_counts):
+            if piece_tokens and piece_tokens + w_count > budget:
+                result.append((piece_start, piece_end))
+                piece_start, piece_tokens = w_start, 0
+            piece_end = w_end
+            piece_tokens += w_count
+        result.append((piece_start, piece_end))
+
+    return result
+
+
+def sliding_windows(
+    text: str,
+    span: Span,
+    count_tokens: Callable[[List[str]], List[int]],
+    budget: int,
+    overlap: int
+) -> List[Tuple[Span, Span]]:
+    """
+    Cover a span with word windows of at most `budget` tokens, where
+    neighbouring windows share about `overlap` tokens of context.
+
+    Returns (window, owned) pairs. Each shared stretch is split at its
+    middle word, so every offset of the span is owned by exactly one
+    window; results from a window should only be kept inside its owned part.
+    """
+    words = [m.span() for m in _WORD_RE.finditer(text, span[0], span[1])]
+    if not words:
+        return []
+    counts = count_tokens([text[s:e] for s, e in words])
+
+    ranges = []  # (first word, end word) per window
+    first = 0
+    while True:
+        end, tokens = first, 0
+        while end < len(words) and (end == first or tokens + counts[end] <= budget):
+            tokens += counts[end]
+            end += 1
+        ranges.append((first, end))
+        if end >= len(words):
+            break
+
+        # Step back up to `overlap` tokens for the next window, always moving forward
+        next_first, shared = end, 0
+        while next_first - 1 > first and shared + counts[next_first - 1] <= overlap:
+            next_first -= 1
+            shared += counts[next_first]
+        first = next_first
+
+    # Ownership boundaries at the middle of each overlap
+    bounds = [span[0]]
+    for (_, prev_end), (next_first, _) in zip(ranges, ranges[1:]):
+        bounds.append(words[(next_first + prev_end) // 2][0])
+    bounds.append(span[1])
+
+    return [
+        ((words[first][0], words[end - 1][1]), (bounds[i], bounds[i + 1]))
+        for i, (first, end) in enumerate(ranges)
+    ]
+
+
+def splice(text: str, spans: Sequence[Span], replacements: Sequence[str]) -> Tuple[str, List[Dict]]:
+    """
+    Replace each (sorted, non-overlapping) span with its replacement while
+    keeping everything between spans verbatim.
+
+    Returns the new text and one segment per span mapping source offsets
+    to offsets in the new text.
+    """
+    parts = []
+    segments = []
+    cursor = 0
+    out_len = 0
+
+    for (start, end), replacement in zip(spans, replacements):
+        gap = text[cursor:start]
+        parts.append(gap)
+        out_len += len(gap)
+
+        segments.append({
+            "source_offset": start,
+            "source_length": end - start,
+            "target_offset": out_len,
+            "target_length": len(replacement)
+        })
+        parts.append(replacement)
+        out_len += len(replacement)
+        cursor = end
+
+    parts.append(text[cursor:])
+    return ''.join(parts), segments
@@ -0,0 +1,222 @@
+"""
+Speculative Greedy Decoding for Seq2seq Models
+A cheap proposer drafts several tokens; the target model verifies them all in
+one forward pass and keeps the longest prefix that matches its own greedy
+choices, plus one token of its own. Output equals plain greedy decoding of the
+target model, but with far fewer target forward passes when drafts are good.
+
+Proposers:
+- DraftModelProposer: a smaller model sharing the tokenizer (e.g. NLLB-600M for NLLB-1.3B)
+- CopyProposer: the input itself, for outputs that mostly copy it (grammar correction)
+"""
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import torch
+
+# propose(decoder_sequence, max_tokens) -> drafted token ids
+Proposer = Callable[[List[int], int], List[int]]
+
+
+def crop_cache(past: Any, length: int) -> Any:
+    """Keep only the first `length` decoder positions of a KV cache"""
+    if past is None:
+        return None
+    if hasattr(past, "crop"):
+        past.crop(length)
+        return past
+    # Legacy tuple format: per layer (self_k, self_v, cross_k, cross_v)
+    return tuple(
+        (layer[0][:, :, :length], layer[1][:, :, :length]) + tuple(layer[2:])
+        for layer in past
+    )
+
+
+class SpeculativeStats:
+    """Thread-safe counters for acceptance rate and speed"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.sequences = 0
+        self.proposed = 0
+        self.accepted = 0
+        self.target_passes = 0
+        self.tokens = 0
+        self.seconds = 0.0
+
+    def record(self, proposed: int, accepted: int, target_passes: int, tokens: int, seconds: float):
+        with self._lock:
+            self.sequences += 1
+            self.proposed += proposed
+            self.accepted += accepted
+            self.target_passes += target_passes
+            self.tokens += tokens
+            self.seconds += seconds
+
+    def as_dict(self) -> Dict:
+        return {
+            "sequences": self.sequences,
+            "proposed_tokens": self.proposed,
+            "accepted_tokens": self.accepted,
+            "acceptance_rate": round(self.accepted / self.proposed, 4) if self.proposed else 0.0,
+            "tokens_per_target_pass": round(self.tokens / self.target_passes, 3) if self.target_passes else 0.0,
+            "ms_per_token": round(1000.0 * self.seconds / self.tokens, 3) if self.tokens else 0.0
+        }
+
+
+class DraftModelProposer:
+    """Greedy drafts from a smaller model, reusing its KV cache across rounds"""
+
+    def __init__(self, draft_model: Any, input_ids: torch.Tensor, attention_mask: torch.Tensor, eos_token_id: int):
+        self.model = draft_model
+        self.attention_mask = attention_mask
+        self.eos_token_id = eos_token_id
+        self.encoder_outputs = draft_model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask)
+
+        self._past = None
+        self._cached: List[int] = []  # decoder tokens covered by the cache
+
+    def __call__(self, sequence: List[int], max_tokens: int) -> List[int]:
+        if max_tokens <= 0:
+            return []
+
+        # Reuse the cache for the prefix the draft has already seen
+        common = 0
+        for cached, token in zip(self._cached, sequence):
+            if cached != token:
+                break
+            common += 1
+        common = min(common, len(sequence) - 1)
+        past = crop_cache(self._past, common)
+
+        feed = sequence[common:]
+        current = list(sequence)
+        drafted = []
+        for _ in range(max_tokens):
+            out = self.model(
+                encoder_outputs=self.encoder_outputs,
+                attention_mask=self.attention_mask,
+                decoder_input_ids=torch.tensor([feed], device=self.attention_mask.device),
+                past_key_values=past,
+                use_cache=True
+            )
+            past = out.past_key_values
+            token = int(out.logits[0, -1].argmax())
+            drafted.append(token)
+            current.append(token)
+            feed = [token]
+            if token == self.eos_token_id:
+                break
+
+        # The last drafted token was never fed, so the cache stops before it
+        self._past = past
+        self._cached = current[:-1]
+        return drafted
+
+
+class CopyProposer:
+    """
+    Drafts the continuation of a source token sequence (input-as-draft).
+    The position in the source is found by matching the last few generated
+    tokens, so drafting resumes after the output diverges from the input.
+    Where nothing matches (a substituted word), the output is assumed to
+    advance through the source one token per generated token.
+    """
+
+    def __init__(self, source: List[int], prefix_length: int = 1, max_ngram: int = 3, slack: int = 8):
+        self.source = source
+        self.prefix_length = prefix_length  # Forced decoder tokens that are not part of the copy
+        self.max_ngram = max_ngram
+        self.slack = slack  # How far back from the last anchor a match may start
+        self._anchor = (0, 0)  # (generated length, source position) of the last match
+
+    def __call__(self, sequence: List[int], max_tokens: int) -> List[int]:
+        if max_tokens <= 0:
+            return []
+        position = self._locate(sequence[self.prefix_length:])
+        return self.source[position:position + max_tokens]
+
+    def _locate(self, generated: List[int]) -> int:
+        """Source index the output is currently copying from"""
+        if generated == self.source[:len(generated)]:
+            self._anchor = (len(generated), len(generated))
+            return len(generated)
+
+        anchor_length, anchor_position = self._anchor
+        for n in range(min(self.max_ngram, len(generated)), 0, -1):
+            tail = generated[-n:]
+            for start in range(max(0, anchor_position - self.slack), len(self.source) - n + 1):
+                if self.source[start:start + n] == tail:
+                    self._anchor = (len(generated), start + n)
+                    return start + n
+
+        return min(len(self.source), anchor_position + len(generated) - anchor_length)
+
+
+def speculative_greedy(
+    model: Any,
+    input_ids: torch.Tensor,
+    attention_mask: torch.Tensor,
+    decoder_prefix: List[int],
+    propose: Proposer,
+    max_new_tokens: int,
+    eos_token_id: int,
+    num_draft_tokens: int = 5,
+    stats: Optional[SpeculativeStats] = None
+) -> List[int]:
+    """
+    Greedy-decode one sequence (batch size 1) with draft verification.
+
+    Args:
+        decoder_prefix: Forced decoder start, e.g. [decoder_start, target_lang]
+        propose: Proposer returning up to N drafted tokens for a decoder sequence
+
+    Returns:
+        Full decoder sequence including the prefix
+    """
+    started = time.perf_counter()
+    encoder_outputs = model.get_encoder()(input_ids=input_ids, attention_mask=attention_mask)
+
+    sequence = list(decoder_prefix)
+    past = None
+    cached = 0
+    generated = proposed = accepted = passes = 0
+
+    while generated < max_new_tokens:
+        draft = propose(sequence, min(num_draft_tokens, max_new_tokens - generated - 1))
+        feed = sequence[cached:] + draft
+
+        out = model(
+            encoder_outputs=encoder_outputs,
+            attention_mask=attention_mask,
+            decoder_input_ids=torch.tensor([feed], device=input_ids.device),
+            past_key_values=past,
+            use_cache=True
+        )
+        passes += 1
+
+        # Target's greedy choice after the last accepted token and after each draft token
+        first = len(sequence) - cached - 1
+        predictions = out.logits[0, first:].argmax(-1).tolist()
+
+        matched = 0
+        while matched < len(draft) and draft[matched] == predictions[matched]:
+            matched += 1
+        new_tokens = draft[:matched] + [predictions[matched]]
+
+        past = crop_cache(out.past_key_values, len(sequence) + matched)
+        cached = len(sequence) + matched
+        sequence.extend(new_tokens)
+
+        generated += len(new_tokens)
+        proposed += len(draft)
+        accepted += matched
+
+        if eos_token_id in new_tokens:
+            sequence = sequence[:len(sequence) - len(new_tokens) + new_tokens.index(eos_token_id) + 1]
+            break
+
+    if stats is not None:
+        stats.record(proposed, accepted, passes, len(sequence) - len(decoder_prefix), time.perf_counter() - started)
+    return sequence
@@ -0,0 +1,113 @@
+"""
+Spelling Engine Benchmark
+Compares SymSpell and the lexicon trie on the configured lexicon: load time,
+resident memory and lookups per second. Each engine runs in its own
+process so the memory figures do not overlap.
+
+Run from backend/:
+    python -m services.spelling.benchmark --queries 2000
+"""
+import argparse
+import json
+import random
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+from config import settings
+from services.normalization import normalize
+from .lexicon import current_rss_bytes, load_symspell, load_trie
+from .trie import read_lexicon
+
+ENGINES = ("symspell", "trie")
+
+
+def make_queries(lexicon_path: str, count: int, seed: int = 13) -> List[str]:
+    """Lexicon words, half of them with one random edit (typo)"""
+    rng = random.Random(seed)
+    words = [normalize(word) for word, _ in read_lexicon(lexicon_path)]
+    if not words:
+        return []
+    alphabet = sorted({ch for word in words[:5000] for ch in word})
+    queries = []
+    for _ in range(count):
+        word = rng.choice(words)
+        if rng.random() < 0.5 and len(word) > 1:
+            i = rng.randrange(len(word))
+            edit = rng.choice(("delete", "insert", "replace"))
+            if edit == "delete":
+                word = word[:i] + word[i + 1:]
+            elif edit == "insert":
+                word = word[:i] + rng.choice(alphabet) + word[i:]
+            else:
+                word = word[:i] + rng.choice(alphabet) + word[i + 1:]
+        queries.append(word)
+    return queries
+
+
+def run_engine(engine: str, queries: List[str]) -> Dict:
+    """Load one engine and time lookups (in the current process)"""
+    rss_start = current_rss_bytes()
+    if engine == "trie":
+        trie, info = load_trie(settings.SPELLING_LEXICON_PATH, settings.SPELLING_TRIE_PATH)
+
+        def lookup(word):
+            return trie.lookup(word, settings.SPELLING_MAX_EDIT_DISTANCE)
+    else:
+        from symspellpy import Verbosity
+
+        symspell, info = load_symspell(
+            settings.SPELLING_LEXICON_PATH,
+            settings.SPELLING_SNAPSHOT_PATH,
+            max_edit_distance=settings.SPELLING_MAX_EDIT_DISTANCE,
+            prefix_length=settings.SPELLING_PREFIX_LENGTH
+        )
+
+        def lookup(word):
+            return symspell.lookup(word, Verbosity.CLOSEST, max_edit_distance=settings.SPELLING_MAX_EDIT_DISTANCE)
+
+    started = time.perf_counter()
+    for word in queries:
+        lookup(word)
+    elapsed = time.perf_counter() - started
+
+    return {
+        "engine": engine,
+        "source": info["source"],
+        "entries": info["entries"],
+        "load_ms": info["load_ms"],
+        "rss_mb": round((current_rss_bytes() - rss_start) / (1024 * 1024), 1),
+        "lookups_per_s": round(len(queries) / elapsed, 1) if elapsed else None
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--engine", choices=ENGINES, help="Benchmark one engine in this process")
+    args = parser.parse_args()
+
+    queries = make_queries(settings.SPELLING_LEXICON_PATH, args.queries)
+    if args.engine:
+        print(json.dumps(run_engine(args.engine, queries)))
+        return
+
+    results = []
+    for engine in ENGINES:
+        out = subprocess.run(
+            [sys.executable, "-m", "services.spelling.benchmark", "--engine", engine, "--queries", str(args.queries)],
+            capture_output=True, text=True
+        )
+        if out.returncode != 0:
+            print(f"{engine}: failed\n{out.stderr.strip()}", file=sys.stderr)
+            continue
+        results.append(json.loads(out.stdout.strip().splitlines()[-1]))
+
+    print(f"{'engine':<10}{'entries':>10}{'load ms':>10}{'RSS MB':>10}{'lookups/s':>12}")
+    for r in results:
+        print(f"{r['engine']:<10}{r['entries']:>10}{r['load_ms']:>10}{r['rss_mb']:>10}{r['lookups_per_s']:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,243 @@
+"""
+Bengali Lexicon and SymSpell Snapshot
+Builds the SymSpell dictionary (and its precomputed deletes index) from a
+frequency lexicon, and saves it as a compressed snapshot that workers load
+without recomputing the index.
+
+Lexicon format: one "word count" pair per line (UTF-8), e.g.
+    আমি 1843520
+Words are stored in their normalized form (services.normalization), so
+differently encoded spellings of a word share one entry.
+
+Build the snapshot once (or let SpellingService build it on first load):
+    python -m services.spelling.lexicon
+
+A JSON sidecar (<snapshot>.meta.json) records the snapshot format, the
+normalization version and the SymSpell settings; a snapshot whose sidecar
+does not match the running configuration is rebuilt.
+"""
+import json
+import logging
+import os
+import time
+from typing import Dict, Tuple
+
+from services.normalization import NORMALIZATION_VERSION, normalize
+from .trie import TrieLexicon, build_trie, encode_trie, read_lexicon, trie_is_fresh
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_VERSION = 1
+
+# Used only when no lexicon file is configured or found
+SEED_WORDS = [
+    ("আমি", 10000), ("তুমি", 8000), ("সে", 8000), ("আমরা", 7000),
+    ("তোমরা", 6000), ("তারা", 6000), ("বাংলা", 9000), ("ভালো", 8000),
+    ("ছিলো", 6000), ("করছে", 7000), ("যাচ্ছে", 7000), ("হয়েছে", 8000),
+    ("গিয়েছে", 7000), ("বই", 7000), ("স্কুল", 7000), ("আছে", 8000)
+]
+
+
+def current_rss_bytes() -> int:
+    """Resident set size of this process (Linux /proc, else peak RSS)"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _new_symspell(max_edit_distance: int, prefix_length: int):
+    from symspellpy import SymSpell
+    return SymSpell(max_dictionary_edit_distance=max_edit_distance, prefix_length=prefix_length)
+
+
+def _load_lexicon(sym_spell, lexicon_path: str) -> bool:
+    """Add every lexicon entry to the dictionary under its normalized form"""
+    if not os.path.exists(lexicon_path):
+        return False
+    with open(lexicon_path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) < 2 or not parts[1].isdigit():
+                continue
+            sym_spell.create_dictionary_entry(normalize(parts[0]), int(parts[1]))
+    return True
+
+
+def _snapshot_meta(max_edit_distance: int, prefix_length: int) -> Dict:
+    return {
+        "format": SNAPSHOT_VERSION,
+        "normalization": NORMALIZATION_VERSION,
+        "max_edit_distance": max_edit_distance,
+        "prefix_length": prefix_length
+    }
+
+
+def _meta_path(snapshot_path: str) -> str:
+    return f"{snapshot_path}.meta.json"
+
+
+def snapshot_is_fresh(
+    lexicon_path: str,
+    snapshot_path: str,
+    max_edit_distance: int = 2,
+    prefix_length: int = 7
+) -> bool:
+    """
+    Whether the snapshot exists, was built with the current format,
+    normalization and settings, and is newer than the lexicon
+    """
+    if not os.path.exists(snapshot_path):
+        return False
+    try:
+        with open(_meta_path(snapshot_path), encoding="utf-8") as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return False
+    if meta != _snapshot_meta(max_edit_distance, prefix_length):
+        logger.info(f"SymSpell snapshot {snapshot_path} was built with other settings ({meta}), rebuilding")
+        return False
+    if not lexicon_path or not os.path.exists(lexicon_path):
+        return True
+    return os.path.getmtime(snapshot_path) >= os.path.getmtime(lexicon_path)
+
+
+def _load_snapshot(snapshot_path: str, max_edit_distance: int, prefix_length: int):
+    """Load a snapshot, or None if symspellpy rejects it or its settings differ"""
+    sym_spell = _new_symspell(max_edit_distance, prefix_length)
+    if not sym_spell.load_pickle(snapshot_path, compressed=True):
+        logger.warning(f"SymSpell snapshot {snapshot_path} has an incompatible data version, rebuilding")
+        return None
+    loaded = (
+        getattr(sym_spell, "_max_dictionary_edit_distance", max_edit_distance),
+        getattr(sym_spell, "_prefix_length", prefix_length)
+    )
+    if loaded != (max_edit_distance, prefix_length) or not sym_spell.words:
+        logger.warning(f"SymSpell snapshot {snapshot_path} does not match the configuration, rebuilding")
+        return None
+    return sym_spell
+
+
+def build_snapshot(
+    lexicon_path: str,
+    snapshot_path: str,
+    max_edit_distance: int = 2,
+    prefix_length: int = 7
+):
+    """
+    Load the lexicon, precompute the deletes index and save a compressed
+    snapshot. Returns the SymSpell instance.
+    """
+    sym_spell = _new_symspell(max_edit_distance, prefix_length)
+    started = time.perf_counter()
+    if not _load_lexicon(sym_spell, lexicon_path):
+        raise FileNotFoundError(f"Lexicon not found: {lexicon_path}")
+    logger.info(f"Indexed {len(sym_spell.words)} words in {time.perf_counter() - started:.1f}s")
+
+    directory = os.path.dirname(snapshot_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Write to a temporary file first so other workers never see a partial snapshot
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    sym_spell.save_pickle(tmp_path, compressed=True)
+    os.replace(tmp_path, snapshot_path)
+    meta_tmp = f"{_meta_path(snapshot_path)}.{os.getpid()}.tmp"
+    with open(meta_tmp, "w", encoding="utf-8") as f:
+        json.dump(_snapshot_meta(max_edit_distance, prefix_length), f)
+    os.replace(meta_tmp, _meta_path(snapshot_path))
+    logger.info(f"✅ SymSpell snapshot saved to {snapshot_path}")
+    return sym_spell
+
+
+def load_symspell(
+    lexicon_path: str,
+    snapshot_path: str,
+    max_edit_distance: int = 2,
+    prefix_length: int = 7
+) -> Tuple[object, Dict]:
+    """
+    Load SymSpell from the snapshot, building it from the lexicon when it
+    is missing or stale, or from the seed words when there is no lexicon.
+
+    Returns:
+        (SymSpell instance, load info: source, entries, load_ms, dictionary_mb)
+    """
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+
+    sym_spell = None
+    source = "snapshot"
+    if snapshot_path and snapshot_is_fresh(lexicon_path, snapshot_path, max_edit_distance, prefix_length):
+        sym_spell = _load_snapshot(snapshot_path, max_edit_distance, prefix_length)
+
+    if sym_spell is None and lexicon_path and os.path.exists(lexicon_path):
+        if snapshot_path:
+            logger.info("Building SymSpell snapshot from lexicon (one-time)...")
+            sym_spell = build_snapshot(lexicon_path, snapshot_path, max_edit_distance, prefix_length)
+        else:
+            sym_spell = _new_symspell(max_edit_distance, prefix_length)
+            _load_lexicon(sym_spell, lexicon_path)
+        source = "lexicon"
+    elif sym_spell is None:
+        logger.warning(f"Bengali lexicon not found at '{lexicon_path}', using the built-in seed words")
+        sym_spell = _new_symspell(max_edit_distance, prefix_length)
+        for word, count in SEED_WORDS:
+            sym_spell.create_dictionary_entry(normalize(word), count)
+        source = "seed"
+
+    info = {
+        "source": source,
+        "entries": len(sym_spell.words),
+        "load_ms": round((time.perf_counter() - started) * 1000, 1),
+        "dictionary_mb": round(max(0, current_rss_bytes() - rss_before) / (1024 * 1024), 1)
+    }
+    return sym_spell, info
+
+
+def load_trie(lexicon_path: str, trie_path: str) -> Tuple[TrieLexicon, Dict]:
+    """
+    Map the lexicon trie, building it from the lexicon when it is missing or
+    stale, or from the seed words (in memory) when there is no lexicon.
+
+    Returns:
+        (TrieLexicon, load info as in load_symspell, plus file_mb)
+    """
+    rss_before = current_rss_bytes()
+    started = time.perf_counter()
+
+    if trie_path and trie_is_fresh(lexicon_path, trie_path):
+        trie = TrieLexicon(trie_path)
+        source = "snapshot"
+    elif lexicon_path and os.path.exists(lexicon_path):
+        logger.info("Building lexicon trie from lexicon (one-time)...")
+        build_trie(read_lexicon(lexicon_path), trie_path)
+        trie = TrieLexicon(trie_path)
+        source = "lexicon"
+    else:
+        logger.warning(f"Bengali lexicon not found at '{lexicon_path}', using the built-in seed words")
+        trie = TrieLexicon(data=encode_trie(SEED_WORDS)[0])
+        source = "seed"
+
+    info = {
+        "source": source,
+        "entries": trie.words,
+        "load_ms": round((time.perf_counter() - started) * 1000, 1),
+        "dictionary_mb": round(max(0, current_rss_bytes() - rss_before) / (1024 * 1024), 1),
+        "file_mb": round(trie.size_bytes / (1024 * 1024), 1)
+    }
+    return trie, info
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m services.spelling.lexicon
+    from config import settings
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    build_snapshot(
+        settings.SPELLING_LEXICON_PATH,
+        settings.SPELLING_SNAPSHOT_PATH,
+        settings.SPELLING_MAX_EDIT_DISTANCE,
+        settings.SPELLING_PREFIX_LENGTH
+    )
@@ -1,15 +1,30 @@
 """
 Spelling Service
-Primary: SymSpell with Bengali dictionary (fastest, most accurate for spelling)
+Primary: SymSpell with Bengali dictionary (fastest, most accurate for spelling),
+or a memory-mapped lexicon trie searched with a Levenshtein automaton
+(SPELLING_ENGINE="trie", far less memory per worker)
 Fallback: LanguageTool (ML-based checker)
 """
 import logging
-from typing import List, Dict, Optional
 import re
+from typing import List, Dict, Optional
 import asyncio
 
+from config import settings
+from services.alignment import tokenize
+from services.cache import LRUCache
+from services.normalization import normalize
+from .lexicon import load_symspell, load_trie
+from .morphology import load_stem_tags, split_suffixes
+
 logger = logging.getLogger(__name__)
 
+# Words to look up: runs of Bengali letters and signs (not digits, dandas or
+# currency signs) or Latin letters, joined across ZWJ/ZWNJ. Punctuation and
+# numbers never reach the lexicon.
+_LETTERS = "\u0980-\u09E5\u09F0\u09F1A-Za-z"
+_WORD_RE = re.compile(f"[{_LETTERS}]+(?:[\u200c\u200d]+[{_LETTERS}]+)*")
+
 class SpellingService:
     """
     Dedicated spelling checking service.
@@ -19,21 +34,40 @@ class SpellingService:
     
     def __init__(self, cache_dir: str = "./models"):
         self.cache_dir = cache_dir
+        self.engine = settings.SPELLING_ENGINE
         self.symspell = None
+        self.trie = None
+        self.lexicon_info: Optional[Dict] = None  # Source, size, load time and memory of the dictionary
+        self.stem_tags: Dict[str, set] = {}  # Stem -> paradigms it inflects in (SPELLING_MORPHOLOGY)
         self.languagetool = None
         self.primary_ready = False
         self.fallback_ready = False
         
+        # Word -> suggestions memo (empty tuple for correct words), shared across requests
+        self.memo = LRUCache(max_entries=settings.SPELLING_MEMO_ENTRIES)
+        self.lookups = 0
+        self.inflections = 0  # Words accepted as known stem + suffix chain
+        self.fuzzy_searches = 0
+        
         logger.info("Spelling Service initialized")
     
     async def load(self):
         """Load spelling checking models"""
-        # Try loading SymSpell (primary)
+        # Try loading the lexicon engine (primary)
         try:
-            logger.info("Loading SymSpell for Bengali...")
-            await self._load_symspell()
+            if self.engine == "trie":
+                logger.info("Loading lexicon trie for Bengali...")
+                await self._load_trie()
+            else:
+                logger.info("Loading SymSpell for Bengali...")
+                await self._load_symspell()
         except Exception as e:
-            logger.warning(f"SymSpell failed to load: {e}")
+            logger.warning(f"{self.primary_name} failed to load: {e}")
+        
+        if self.primary_ready and settings.SPELLING_MORPHOLOGY:
+            loop = asyncio.get_event_loop()
+            self.stem_tags = await loop.run_in_executor(None, load_stem_tags, settings.SPELLING_LEXICON_PATH)
+            logger.info(f"✅ Suffix morphology enabled for {len(self.stem_tags)} tagged stems")
         
         # Try loading LanguageTool (fallback)
         if not self.primary_ready:
@@ -44,31 +78,41 @@ class SpellingService:
                 logger.error(f"LanguageTool failed to load: {e}")
     
     async def _load_symspell(self):
-        """Load SymSpell with Bengali dictionary"""
+        """Load SymSpell with the Bengali lexicon (from the prebuilt snapshot when available)"""
         loop = asyncio.get_event_loop()
         
         def load():
-            from symspellpy import SymSpell, Verbosity
-            
-            sym_spell = SymSpell(max_dictionary_edit_distance=2, prefix_length=7)
-            
-            # Load Bengali dictionary - AI-powered fuzzy matching
-            # Common Bengali words for the dictionary
-            bengali_words = [
-                ("আমি", 10000), ("তুমি", 8000), ("সে", 8000), ("আমরা", 7000),
-                ("তোমরা", 6000), ("তারা", 6000), ("বাংলা", 9000), ("ভালো", 8000),
-                ("ছিলো", 6000), ("করছে", 7000), ("যাচ্ছে", 7000), ("হয়েছে", 8000),
-                ("গিয়েছে", 7000), ("বই", 7000), ("স্কুল", 7000), ("আছে", 8000)
-            ]
-            
-            for word, freq in bengali_words:
-                sym_spell.create_dictionary_entry(word, freq)
-            
-            return sym_spell
+            return load_symspell(
+                settings.SPELLING_LEXICON_PATH,
+                settings.SPELLING_SNAPSHOT_PATH,
+                max_edit_distance=settings.SPELLING_MAX_EDIT_DISTANCE,
+                prefix_length=settings.SPELLING_PREFIX_LENGTH
+            )
+        
+        self.symspell, self.lexicon_info = await loop.run_in_executor(None, load)
+        self.primary_ready = True
+        logger.info(
+            f"✅ SymSpell loaded with Bengali dictionary! ({self.lexicon_info['entries']} words "
+            f"from {self.lexicon_info['source']} in {self.lexicon_info['load_ms']} ms)"
+        )
+    
+    async def _load_trie(self):
+        """Map the Bengali lexicon trie (built from the lexicon on first use)"""
+        loop = asyncio.get_event_loop()
+        
+        def load():
+            return load_trie(settings.SPELLING_LEXICON_PATH, settings.SPELLING_TRIE_PATH)
         
-        self.symspell = await loop.run_in_executor(None, load)
+        self.trie, self.lexicon_info = await loop.run_in_executor(None, load)
         self.primary_ready = True
-        logger.info("✅ SymSpell loaded with Bengali dictionary!")
+        logger.info(
+            f"✅ Lexicon trie loaded! ({self.lexicon_info['entries']} words, "
+            f"{self.lexicon_info['file_mb']} MB mapped, in {self.lexicon_info['load_ms']} ms)"
+        )
+    
+    @property
+    def primary_name(self) -> str:
+        return "LexiconTrie" if self.engine == "trie" else "SymSpell"
     
     async def _load_languagetool(self):
         """Load LanguageTool for Bengali"""
@@ -92,31 +136,48 @@ class SpellingService:
             return []
         
         if self.primary_ready:
-            return await self._check_with_symspell(text)
+            return await self._check_with_lexicon(text)
         elif self.fallback_ready:
             return await self._check_with_languagetool(text)
         else:
             logger.warning("No spelling models available")
             return []
     
-    async def _check_with_symspell(self, text: str) -> List[Dict]:
-        """Use SymSpell for spelling check"""
+    async def _check_with_lexicon(self, text: str) -> List[Dict]:
+        """
+        Use the lexicon engine (SymSpell or trie) for spelling check.
+        Only letter runs are checked, so trailing punctuation does not make
+        a word unknown. Words are looked up by their normalized form, so a correctly spelled
+        word in a different encoding is not sent to the fuzzy search. Each
+        distinct word is looked up once per document; memoized words skip
+        the engine and the rest run in the executor in batches, so a long
+        document never blocks the event loop.
+        """
         try:
-            from symspellpy import Verbosity
+            tokens = tokenize(text, _WORD_RE)
+            suggestions: Dict[str, tuple] = {}
+            missing = []
+            keys = {word: normalize(word) for word, _, _ in tokens}
+            for key in dict.fromkeys(keys.values()):
+                cached = self.memo.get(key)
+                if cached is None:
+                    missing.append(key)
+                else:
+                    suggestions[key] = cached
             
-            errors = []
-            words = re.findall(r'\S+', text)
-            current_pos = 0
+            loop = asyncio.get_event_loop()
+            batch_size = max(1, settings.SPELLING_LOOKUP_BATCH)
+            for i in range(0, len(missing), batch_size):
+                batch = missing[i:i + batch_size]
+                results = await loop.run_in_executor(None, self._lookup_batch_sync, batch)
+                for key, terms in zip(batch, results):
+                    self.memo.put(key, terms)
+                    suggestions[key] = terms
             
-            for word in words:
-                word_start = text.index(word, current_pos)
-                current_pos = word_start + len(word)
-                
-                # Get AI-based suggestions
-                suggestions = self.symspell.lookup(word, Verbosity.CLOSEST, max_edit_distance=2)
-                
-                if suggestions and suggestions[0].term != word:
-                    suggestion_words = [s.term for s in suggestions[:3]]
+            errors = []
+            for word, word_start, _ in tokens:
+                suggestion_words = list(suggestions[keys[word]])
+                if suggestion_words:
                     errors.append({
                         "type": "spelling",
                         "offset": word_start,
@@ -131,9 +192,58 @@ class SpellingService:
             return errors
             
         except Exception as e:
-            logger.error(f"SymSpell check failed: {e}")
+            logger.error(f"{self.primary_name} check failed: {e}")
             return []
     
+    def _lookup_batch_sync(self, words: List[str]) -> List[tuple]:
+        """Top suggestions per normalized word, or an empty tuple when it is correct (runs in executor)"""
+        results = [self._suggest(word) for word in words]
+        self.lookups += len(words)
+        return results
+    
+    def _suggest(self, word: str) -> tuple:
+        """
+        Suggestions for one normalized word.
+        With SPELLING_MORPHOLOGY, a stem tagged with a paradigm plus a valid
+        chain of that paradigm is correct, and fuzzy search runs on the stem
+        of the longest chains first, re-attaching the chain to candidate
+        stems of the same paradigm.
+        """
+        if self._known(word):
+            return ()
+        
+        if self.stem_tags:
+            splits = split_suffixes(word)
+            if any(paradigm in self.stem_tags.get(stem, ()) for stem, _, paradigm in splits):
+                self.inflections += 1
+                return ()
+            for stem, chain, paradigm in splits[:settings.SPELLING_STEM_SEARCHES]:
+                candidates = [c for c in self._fuzzy(stem) if paradigm in self.stem_tags.get(c, ())]
+                if candidates:
+                    return tuple(candidate + chain for candidate in candidates[:3])
+        
+        return tuple(self._fuzzy(word)[:3])
+    
+    def _known(self, word: str) -> bool:
+        """Exact dictionary hit"""
+        if self.engine == "trie":
+            return word in self.trie
+        return word in self.symspell.words
+    
+    def _fuzzy(self, word: str) -> List[str]:
+        """Closest dictionary words within the edit distance, most frequent first"""
+        self.fuzzy_searches += 1
+        if self.engine == "trie":
+            found = self.trie.lookup(word, settings.SPELLING_MAX_EDIT_DISTANCE)
+            return [term for term, _, _ in found if term != word]
+        
+        from symspellpy import Verbosity
+        
+        found = self.symspell.lookup(
+            word, Verbosity.CLOSEST, max_edit_distance=settings.SPELLING_MAX_EDIT_DISTANCE
+        )
+        return [s.term for s in found if s.term != word]
+    
     async def _check_with_languagetool(self, text: str) -> List[Dict]:
         """Use LanguageTool for spelling check"""
         try:
@@ -170,6 +280,8 @@ class SpellingService:
         logger.info("Cleaning up spelling service...")
         if self.languagetool:
             self.languagetool.close()
+        if self.trie:
+            self.trie.close()
 
 # Global instance
 _service: Optional[SpellingService] = None
@@ -0,0 +1,165 @@
+"""
+Bengali Suffix Morphology
+Splits inflected words into stem + suffix chain, so the spelling lexicon
+only needs stems: a word is valid when a known stem combines with a valid
+chain, and fuzzy search runs on the stem alone.
+
+Chains follow slot order, each slot optional:
+    noun: stem + classifier/plural + case + particle   (বই-গুলো-কে-ই)
+    verb: root + tense/person ending + particle        (কর-ছিলাম-ও)
+
+Stems are tagged with the paradigms they inflect in, in a third lexicon
+column ("n", "v" or "nv"); a chain is only accepted on a stem tagged with
+its paradigm. Untagged words never take suffixes.
+
+A single-character suffix (a bare vowel sign or letter such as ে, ো, র, ল)
+may not attach directly to the stem, since an extra trailing matra or
+letter is a common typo; such forms (ঘরে, করল) stay in the lexicon as
+full words. Allomorphs (ের / র, তে / েতে ...) are listed side by side
+without checking whether the stem ends in a vowel.
+
+Compact an inflected-form lexicon to tagged stems (from backend/):
+    python -m services.spelling.morphology full_lexicon.txt stem_lexicon.txt
+"""
+import logging
+import os
+import sys
+from typing import Dict, Iterable, List, Set, Tuple
+
+from services.normalization import normalize
+
+logger = logging.getLogger(__name__)
+
+# Minimum stem length in characters; shorter "stems" are mostly accidental splits
+MIN_STEM = 2
+# Shortest suffix that may attach directly to a stem
+MIN_STEM_SUFFIX = 2
+
+NOUN = "n"
+VERB = "v"
+
+CLASSIFIERS = [
+    "টা", "টি", "টো", "খানা", "খানি", "গুলো", "গুলি", "গুলা", "রা", "েরা", "এরা", "দের"
+]
+CASES = [
+    "কে", "রে", "র", "ের", "এর", "য়ের", "তে", "েতে", "য়", "য়ে", "ে", "এ"
+]
+PARTICLES = ["ই", "ও"]
+VERB_ENDINGS = [
+    # Present and imperative
+    "ি", "িস", "ে", "েন", "ো", "ুন",
+    # Present continuous (also -চ্ছ- after vowel-final roots)
+    "ছি", "ছিস", "ছে", "ছেন", "ছো", "চ্ছি", "চ্ছিস", "চ্ছে", "চ্ছেন", "চ্ছো",
+    # Present perfect
+    "েছি", "েছিস", "েছে", "েছেন", "েছো",
+    # Past and past continuous / perfect
+    "লাম", "লি", "লে", "লেন", "ল", "লো",
+    "ছিলাম", "ছিলি", "ছিলে", "ছিলেন", "ছিল", "ছিলো",
+    "চ্ছিলাম", "চ্ছিলি", "চ্ছিলে", "চ্ছিলেন", "চ্ছিল", "চ্ছিলো",
+    "েছিলাম", "েছিলি", "েছিলে", "েছিলেন", "েছিল", "েছিলো",
+    # Habitual past, future, verbal nouns
+    "তাম", "তিস", "তে", "তেন", "ত", "তো",
+    "ব", "বো", "বি", "বে", "বেন",
+    "বার", "া", "ানো"
+]
+
+# Slots in surface order; a chain uses each slot at most once, left to right
+NOUN_SLOTS: List[List[str]] = [CLASSIFIERS, CASES, PARTICLES]
+VERB_SLOTS: List[List[str]] = [VERB_ENDINGS, PARTICLES]
+
+# (stem, suffix chain, paradigm)
+Split = Tuple[str, str, str]
+
+
+def _prepare(slots: List[List[str]]) -> List[List[str]]:
+    """Normalize suffixes (like lexicon entries) and try longer ones first"""
+    return [sorted({normalize(s) for s in slot}, key=len, reverse=True) for slot in slots]
+
+
+_PARADIGMS = {NOUN: _prepare(NOUN_SLOTS), VERB: _prepare(VERB_SLOTS)}
+
+
+def split_suffixes(word: str) -> List[Split]:
+    """
+    All (stem, suffix chain, paradigm) splits of a normalized word, longest
+    chain first. The unsplit word is not included.
+    """
+    splits: Dict[Tuple[str, str], str] = {}
+
+    def strip(remaining: str, chain: str, paradigm: str, upto: int):
+        slots = _PARADIGMS[paradigm]
+        # Suffixes are removed right to left, so slots are tried from the last one down
+        for index in range(upto - 1, -1, -1):
+            for suffix in slots[index]:
+                if remaining.endswith(suffix) and len(remaining) - len(suffix) >= MIN_STEM:
+                    stem = remaining[:-len(suffix)]
+                    if len(suffix) >= MIN_STEM_SUFFIX:
+                        splits.setdefault((stem, paradigm), suffix + chain)
+                    strip(stem, suffix + chain, paradigm, index)
+
+    for paradigm, slots in _PARADIGMS.items():
+        strip(word, "", paradigm, len(slots))
+    ordered = sorted(splits.items(), key=lambda item: len(item[1]), reverse=True)
+    return [(stem, chain, paradigm) for (stem, paradigm), chain in ordered]
+
+
+def parse_tags(field: str) -> Set[str]:
+    """Paradigm tags of a lexicon entry ("n", "v", "nv"; anything else is ignored)"""
+    return {tag for tag in field if tag in _PARADIGMS}
+
+
+def load_stem_tags(lexicon_path: str) -> Dict[str, Set[str]]:
+    """Tagged stems of a "word count tags" lexicon (untagged words are left out)"""
+    tags: Dict[str, Set[str]] = {}
+    if not lexicon_path or not os.path.exists(lexicon_path):
+        return tags
+    with open(lexicon_path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 3 and parts[1].isdigit():
+                paradigms = parse_tags(parts[2])
+                if paradigms:
+                    tags.setdefault(normalize(parts[0]), set()).update(paradigms)
+    return tags
+
+
+def compact_lexicon(entries: Iterable[Tuple[str, int]]) -> Tuple[Dict[str, int], Dict[str, Set[str]]]:
+    """
+    Reduce an inflected-form lexicon to tagged stems: a word whose stem (for
+    some valid suffix chain) is itself in the lexicon is dropped, its count
+    is added to that stem, and the stem is tagged with the chain's paradigm.
+    Words without such a stem are kept as they are.
+
+    Returns:
+        (word -> count, stem -> paradigm tags)
+    """
+    counts: Dict[str, int] = {}
+    for word, count in entries:
+        word = normalize(word)
+        counts[word] = counts.get(word, 0) + count
+
+    stems = dict(counts)
+    tags: Dict[str, Set[str]] = {}
+    # Shortest words first, so chains collapse onto the shortest known stem
+    for word in sorted(counts, key=len):
+        for stem, _, paradigm in split_suffixes(word):
+            if stem in stems and stem != word:
+                stems[stem] += stems.pop(word, 0)
+                tags.setdefault(stem, set()).add(paradigm)
+                break
+    return stems, tags
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m services.spelling.morphology <lexicon> <stem lexicon>
+    from .trie import read_lexicon
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    source, target = sys.argv[1], sys.argv[2]
+    entries = list(read_lexicon(source))
+    stems, tags = compact_lexicon(entries)
+    with open(target, "w", encoding="utf-8") as f:
+        for word, count in sorted(stems.items(), key=lambda item: -item[1]):
+            paradigms = "".join(sorted(tags.get(word, ())))
+            f.write(f"{word} {count} {paradigms}\n" if paradigms else f"{word} {count}\n")
+    logger.info(f"✅ {len(entries)} words compacted to {len(stems)} stems in {target}")
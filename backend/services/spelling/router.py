@@ -7,6 +7,7 @@ from pydantic import BaseModel
 from typing import List
 import logging
 
+from .lexicon import current_rss_bytes
 from .model import get_spelling_service
 
 router = APIRouter()
@@ -27,7 +28,7 @@ class SpellingCheckRequest(BaseModel):
 
 class SpellingCheckResponse(BaseModel):
     errors: List[SpellingError]
-    checked_by: str  # "SymSpell" or "LanguageTool"
+    checked_by: str  # "SymSpell", "LexiconTrie" or "LanguageTool"
 
 @router.post("/check-spelling", response_model=SpellingCheckResponse)
 async def check_spelling(request: SpellingCheckRequest):
@@ -48,7 +49,7 @@ async def check_spelling(request: SpellingCheckRequest):
         errors = await service.check_spelling(request.text)
         
         # Determine which model was used
-        model_used = "SymSpell" if service.primary_ready else "LanguageTool"
+        model_used = service.primary_name if service.primary_ready else "LanguageTool"
         
         return SpellingCheckResponse(
             errors=errors,
@@ -67,8 +68,15 @@ async def spelling_health():
     service = get_spelling_service()
     return {
         "service": "spelling",
-        "primary": "SymSpell",
+        "primary": service.primary_name,
         "primary_ready": service.primary_ready,
+        "lexicon": service.lexicon_info,
+        "rss_mb": round(current_rss_bytes() / (1024 * 1024), 1),
+        "lookups": service.lookups,
+        "fuzzy_searches": service.fuzzy_searches,
+        "inflections": service.inflections,
+        "tagged_stems": len(service.stem_tags),
+        "memo": service.memo.stats(),
         "fallback": "LanguageTool",
         "fallback_ready": service.fallback_ready,
         "status": "healthy" if (service.primary_ready or service.fallback_ready) else "loading"
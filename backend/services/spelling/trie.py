@@ -0,0 +1,316 @@
+"""
+Compact Trie Lexicon
+A memory-mapped array trie of the spelling lexicon, searched with a
+Levenshtein automaton, as a low-memory alternative to SymSpell's deletes
+index (which grows sharply with a large, heavily inflected lexicon and is
+duplicated in every worker).
+
+File layout (little-endian uint32 words):
+    header:      magic, format version, normalization version, node count N,
+                 edge count E, word count
+    edge_start:  N + 1 entries; the edges of node i are edge_start[i]:edge_start[i + 1]
+    counts:      N entries; word frequency, 0 for nodes that do not end a word
+    labels:      E entries; code point of each edge, sorted within a node
+    targets:     E entries; child node of each edge
+
+Nodes are numbered breadth-first with the root as node 0. The file is read
+through mmap, so workers share one copy in the page cache. A file with
+another format or normalization version is rebuilt.
+
+Build (from backend/):
+    python -m services.spelling.trie
+"""
+import logging
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections import deque
+from typing import Iterable, List, Optional, Tuple
+
+from services.normalization import NORMALIZATION_VERSION, normalize
+
+logger = logging.getLogger(__name__)
+
+MAGIC = 0x52544E42  # "BNTR"
+VERSION = 2
+_HEADER = struct.Struct("<6I")
+
+# (term, edit distance, count)
+Candidate = Tuple[str, int, int]
+
+
+def build_trie(entries: Iterable[Tuple[str, int]], path: str) -> Tuple[int, int]:
+    """
+    Write a trie file for (word, count) entries. Words are normalized and
+    the counts of duplicate words are summed.
+
+    Returns:
+        (node count, word count)
+    """
+    data, nodes, words = encode_trie(entries)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+    return nodes, words
+
+
+def encode_trie(entries: Iterable[Tuple[str, int]]) -> Tuple[bytes, int, int]:
+    """
+    Serialized trie for (word, count) entries (see the module docstring).
+
+    Returns:
+        (trie bytes, node count, word count)
+    """
+    # Pointer trie first; it only lives for the duration of the build
+    children: List[dict] = [{}]
+    counts: List[int] = [0]
+    for word, count in entries:
+        node = 0
+        for ch in normalize(word):
+            child = children[node].get(ch)
+            if child is None:
+                child = len(children)
+                children[node][ch] = child
+                children.append({})
+                counts.append(0)
+            node = child
+        if node:
+            counts[node] += count
+
+    # Renumber breadth-first so that each node's edges are contiguous
+    order = [0]
+    new_id = {0: 0}
+    queue = deque([0])
+    while queue:
+        node = queue.popleft()
+        for ch in sorted(children[node]):
+            child = children[node][ch]
+            new_id[child] = len(order)
+            order.append(child)
+            queue.append(child)
+
+    edge_start = array("I")
+    node_counts = array("I")
+    labels = array("I")
+    targets = array("I")
+    for node in order:
+        edge_start.append(len(labels))
+        node_counts.append(min(counts[node], 0xFFFFFFFF))
+        for ch in sorted(children[node]):
+            labels.append(ord(ch))
+            targets.append(new_id[children[node][ch]])
+    edge_start.append(len(labels))
+
+    words = sum(1 for count in node_counts if count)
+    parts = [_HEADER.pack(MAGIC, VERSION, NORMALIZATION_VERSION, len(order), len(labels), words)]
+    for part in (edge_start, node_counts, labels, targets):
+        if sys.byteorder != "little":
+            part.byteswap()
+        parts.append(part.tobytes())
+    return b"".join(parts), len(order), words
+
+
+def read_lexicon(lexicon_path: str) -> Iterable[Tuple[str, int]]:
+    """(word, count) entries of a "word count" lexicon file"""
+    with open(lexicon_path, encoding="utf-8") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                yield parts[0], int(parts[1])
+
+
+def read_header(path: str) -> Optional[Tuple[int, ...]]:
+    """Header fields of a trie file, or None if it is not a current trie"""
+    try:
+        with open(path, "rb") as f:
+            header = _HEADER.unpack(f.read(_HEADER.size))
+    except (OSError, struct.error):
+        return None
+    magic, version, normalization = header[:3]
+    if magic != MAGIC or version != VERSION or normalization != NORMALIZATION_VERSION:
+        return None
+    return header
+
+
+class TrieLexicon:
+    """Read-only trie with exact and fuzzy lookup, memory-mapped from a file or held in memory"""
+
+    def __init__(self, path: Optional[str] = None, data: Optional[bytes] = None):
+        self.path = path
+        self._file = None
+        self._mmap = None
+        if data is None:
+            self._file = open(path, "rb")
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            data = self._mmap
+        self._size = len(data)
+
+        magic, version, normalization, nodes, edges, words = _HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION or normalization != NORMALIZATION_VERSION:
+            raise ValueError(f"Not a version {VERSION} lexicon trie (normalization {NORMALIZATION_VERSION}): {path}")
+        if sys.byteorder != "little":
+            raise ValueError("Lexicon tries are little-endian and cannot be mapped on this platform")
+
+        data = memoryview(data)[_HEADER.size:].cast("I")
+        self.node_count = nodes
+        self.edge_count = edges
+        self.words = words
+        self._edge_start = data[:nodes + 1]
+        self._counts = data[nodes + 1:2 * nodes + 1]
+        self._labels = data[2 * nodes + 1:2 * nodes + 1 + edges]
+        self._targets = data[2 * nodes + 1 + edges:2 * nodes + 1 + 2 * edges]
+        self._data = data
+
+    @property
+    def size_bytes(self) -> int:
+        return self._size
+
+    def _child(self, node: int, code: int) -> Optional[int]:
+        """Binary search of a node's sorted edge labels"""
+        lo, hi = self._edge_start[node], self._edge_start[node + 1]
+        labels = self._labels
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if labels[mid] < code:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._edge_start[node + 1] and labels[lo] == code:
+            return self._targets[lo]
+        return None
+
+    def count(self, word: str) -> int:
+        """Frequency of an exact (normalized) word, 0 if absent"""
+        node = 0
+        for ch in word:
+            node = self._child(node, ord(ch))
+            if node is None:
+                return 0
+        return self._counts[node]
+
+    def __contains__(self, word: str) -> bool:
+        return self.count(word) > 0
+
+    def lookup(self, word: str, max_distance: int = 2, closest: bool = True) -> List[Candidate]:
+        """
+        Words within `max_distance` (optimal string alignment: insertions,
+        deletions, substitutions, adjacent transpositions).
+
+        With `closest`, distances are tried in increasing order and only
+        the nearest non-empty set is searched and returned, as with
+        SymSpell's Verbosity.CLOSEST; a tight bound prunes most of the trie.
+
+        Returns:
+            (term, distance, count), sorted by distance then frequency
+        """
+        count = self.count(word)
+        if count:
+            return [(word, 0, count)]
+
+        bounds = range(1, max_distance + 1) if closest else [max_distance]
+        for bound in bounds:
+            found = self._search(word, bound)
+            if found:
+                found.sort(key=lambda c: (c[1], -c[2]))
+                return found
+        return []
+
+    def _search(self, word: str, max_distance: int) -> List[Candidate]:
+        """
+        Walk the trie while stepping a Levenshtein automaton over `word`.
+
+        The automaton state is the DP row of distances between the trie path
+        and each prefix of `word`. Only the diagonal band of width
+        2 * max_distance + 1 can stay within the bound, so only the band is
+        computed, and a subtree is dropped as soon as its whole row exceeds
+        the bound. Every label that does not occur in `word` leads to the
+        same row, so that row is computed once per node; when it is over the
+        bound, only the edges labelled with characters of `word` are visited.
+        """
+        codes = [ord(ch) for ch in word]
+        alphabet = set(codes)
+        ordered_alphabet = sorted(alphabet)
+        width = len(codes) + 1
+        limit = max_distance + 1
+        edge_start, counts, labels, targets = self._edge_start, self._counts, self._labels, self._targets
+        found: List[Candidate] = []
+
+        def step(row, previous, last, label, depth):
+            """Next automaton state, or None when it is over the bound"""
+            new_row = [limit] * width
+            new_row[0] = best = min(depth, limit)
+            for i in range(max(1, depth - max_distance), min(width - 1, depth + max_distance) + 1):
+                value = row[i - 1] if codes[i - 1] == label else row[i - 1] + 1
+                if row[i] + 1 < value:
+                    value = row[i] + 1
+                if new_row[i - 1] + 1 < value:
+                    value = new_row[i - 1] + 1
+                # Adjacent transposition
+                if (previous is not None and i > 1 and label == codes[i - 2]
+                        and last == codes[i - 1] and previous[i - 2] + 1 < value):
+                    value = previous[i - 2] + 1
+                if value < limit:
+                    new_row[i] = value
+                    if value < best:
+                        best = value
+            return new_row if best <= max_distance else None
+
+        # (node, depth, path, row, previous row, label of the edge into node)
+        stack = [(0, 0, "", [min(i, limit) for i in range(width)], None, -1)]
+        while stack:
+            node, depth, path, row, previous, last = stack.pop()
+            first, end = edge_start[node], edge_start[node + 1]
+            if first == end:
+                continue
+            depth += 1
+
+            other = step(row, previous, last, -1, depth)
+            if other is None and end - first > 4 * len(alphabet):
+                # Wide node: binary-search the few labels worth visiting
+                edges = [(code, self._child(node, code)) for code in ordered_alphabet]
+                edges = [(code, child) for code, child in edges if child is not None]
+            else:
+                edges = zip(labels[first:end].tolist(), targets[first:end].tolist())
+                if other is None:
+                    edges = [(code, child) for code, child in edges if code in alphabet]
+
+            for label, child in edges:
+                new_row = step(row, previous, last, label, depth) if label in alphabet else other
+                if new_row is None:
+                    continue
+                term = path + chr(label)
+                if new_row[-1] <= max_distance and counts[child]:
+                    found.append((term, new_row[-1], counts[child]))
+                stack.append((child, depth, term, new_row, row, label))
+        return found
+
+    def close(self):
+        for view in (self._edge_start, self._counts, self._labels, self._targets, self._data):
+            view.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._file.close()
+
+
+def trie_is_fresh(lexicon_path: str, trie_path: str) -> bool:
+    """Whether the trie file exists, has the current format and normalization, and is newer than the lexicon"""
+    if read_header(trie_path) is None:
+        return False
+    if not lexicon_path or not os.path.exists(lexicon_path):
+        return True
+    return os.path.getmtime(trie_path) >= os.path.getmtime(lexicon_path)
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m services.spelling.trie
+    from config import settings
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    nodes, words = build_trie(read_lexicon(settings.SPELLING_LEXICON_PATH), settings.SPELLING_TRIE_PATH)
+    logger.info(f"✅ Lexicon trie saved to {settings.SPELLING_TRIE_PATH} ({words} words, {nodes} nodes)")
@@ -0,0 +1,177 @@
+"""
+Dynamic micro-batching scheduler for translation
+Collects concurrent requests for a short window and runs them as padded batches
+"""
+import logging
+import asyncio
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (batch key, text, future awaiting the result)
+_Pending = Tuple[Hashable, str, asyncio.Future]
+
+
+class TranslationBatcher:
+    """
+    Groups concurrent translation requests by key (e.g. language pair)
+    and runs each group as one padded `generate` call.
+
+    Requests wait at most `max_wait_ms` for peers before a batch is flushed.
+    Batches run one at a time in the executor, so requests that arrive while
+    the model is busy pile up and form the next, larger batch.
+
+    If `length_fn` (texts -> token counts) is given, groups larger than one
+    batch are sorted by length before being split, so each batch holds
+    similarly sized inputs and wastes little compute on padding.
+    """
+
+    def __init__(
+        self,
+        run_batch: Callable[[Hashable, List[str]], List[str]],
+        max_batch_size: int = 8,
+        max_wait_ms: float = 5.0,
+        length_fn: Optional[Callable[[List[str]], List[int]]] = None
+    ):
+        self.run_batch = run_batch
+        self.length_fn = length_fn
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max(0.0, max_wait_ms) / 1000.0
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+        # Statistics
+        self.batches_run = 0
+        self.requests_served = 0
+
+    async def submit(self, key: Hashable, text: str) -> str:
+        """Queue one text for translation and wait for its result"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((key, text, future))
+        return await future
+
+    def _ensure_worker(self):
+        """Start the scheduler loop on first use"""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+
+    async def _collect(self) -> List[_Pending]:
+        """Wait for a first request, then gather peers until the window closes"""
+        loop = asyncio.get_running_loop()
+        pending = [await self._queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while True:
+            # Drain everything that is already queued
+            while not self._queue.empty():
+                pending.append(self._queue.get_nowait())
+
+            remaining = deadline - loop.time()
+            if len(pending) >= self.max_batch_size or remaining <= 0:
+                return pending
+
+            try:
+                pending.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                return pending
+
+    async def _form_batches(self, pending: List[_Pending]) -> List[List[_Pending]]:
+        """Group pending requests by key and split groups into length-sorted batches"""
+        groups: Dict[Hashable, List[_Pending]] = {}
+        for item in pending:
+            groups.setdefault(item[0], []).append(item)
+
+        batches = []
+        for group in groups.values():
+            if self.length_fn is not None and len(group) > self.max_batch_size:
+                try:
+                    loop = asyncio.get_running_loop()
+                    lengths = await loop.run_in_executor(
+                        None, self.length_fn, [text for _, text, _ in group]
+                    )
+                    order = sorted(range(len(group)), key=lengths.__getitem__)
+                    group = [group[i] for i in order]
+                except Exception as e:
+                    logger.warning(f"Length bucketing skipped: {e}")
+
+            for i in range(0, len(group), self.max_batch_size):
+                batches.append(group[i:i + self.max_batch_size])
+        return batches
+
+    async def _run(self):
+        """Scheduler loop"""
+        loop = asyncio.get_running_loop()
+
+        while True:
+            pending = await self._collect()
+
+            for batch in await self._form_batches(pending):
+                # Drop requests whose callers have gone away
+                batch = [item for item in batch if not item[2].done()]
+                if not batch:
+                    continue
+
+                key = batch[0][0]
+                texts = [text for _, text, _ in batch]
+
+                try:
+                    results = await loop.run_in_executor(None, self.run_batch, key, texts)
+                except Exception as e:
+                    logger.error(f"Translation batch of {len(texts)} failed: {e}")
+                    if len(batch) > 1:
+                        # Retry one by one so a single bad input only fails itself
+                        await self._run_individually(batch)
+                    elif not batch[0][2].done():
+                        batch[0][2].set_exception(e)
+                    continue
+
+                for (_, _, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+                self.batches_run += 1
+                self.requests_served += len(batch)
+                logger.debug(f"Translated batch of {len(batch)} for {key}")
+
+    async def _run_individually(self, batch: List[_Pending]):
+        """Run each request of a failed batch on its own"""
+        loop = asyncio.get_running_loop()
+        for key, text, future in batch:
+            if future.done():
+                continue
+            try:
+                result = (await loop.run_in_executor(None, self.run_batch, key, [text]))[0]
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+                continue
+            if not future.done():
+                future.set_result(result)
+            self.batches_run += 1
+            self.requests_served += 1
+
+    def stats(self) -> Dict:
+        """Scheduler statistics for health endpoints"""
+        return {
+            "max_batch_size": self.max_batch_size,
+            "max_wait_ms": self.max_wait * 1000.0,
+            "batches_run": self.batches_run,
+            "requests_served": self.requests_served,
+            "avg_batch_size": (
+                round(self.requests_served / self.batches_run, 2) if self.batches_run else 0.0
+            ),
+            "queue_depth": self.queue_depth
+        }
+
+    @property
+    def queue_depth(self) -> int:
+        return self._queue.qsize() if self._queue is not None else 0
+
+    def close(self):
+        """Stop the scheduler loop"""
+        if self._worker is not None and not self._worker.done():
+            self._worker.cancel()
+        self._worker = None
@@ -0,0 +1,191 @@
+"""
+Translation Memory
+Sentence-level cache of NLLB output: in-process LRU tier backed by SQLite on disk
+"""
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+from services.cache import LRUCache, normalize_text
+
+logger = logging.getLogger(__name__)
+
+
+class TranslationMemory:
+    """
+    Two-tier translation memory.
+    Tier 1: in-process LRU (fast, per worker)
+    Tier 2: SQLite database (shared by workers on a host, survives restarts),
+    bounded by row count and age: rows past max_age_s and the oldest rows
+    beyond max_rows are pruned on open() and every prune_every inserts
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[str] = None,
+        max_entries: int = 10000,
+        max_rows: int = 0,
+        max_age_s: float = 0.0,
+        prune_every: int = 1000
+    ):
+        self.db_path = db_path
+        self.lru = LRUCache(max_entries)
+        self.max_rows = max_rows  # 0 = unbounded
+        self.max_age_s = max_age_s  # 0 = no expiry
+        self.prune_every = max(1, prune_every)
+
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._inserts_since_prune = 0
+
+        # Statistics
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.pruned = 0
+
+    def open(self):
+        """Open (and create if needed) the on-disk tier"""
+        if not self.db_path:
+            return
+        try:
+            directory = os.path.dirname(self.db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, translation TEXT NOT NULL, created REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS translations_created ON translations (created)")
+            conn.commit()
+            self._conn = conn
+            with self._lock:
+                self._prune()
+            logger.info(f"✅ Translation memory opened at {self.db_path}")
+        except Exception as e:
+            logger.warning(f"Translation memory disk tier unavailable: {e}")
+            self._conn = None
+
+    @staticmethod
+    def make_key(
+        source: str,
+        source_lang: str,
+        target_lang: str,
+        model_name: str,
+        decoding: str
+    ) -> str:
+        """Key for one sentence under a given language pair, model and decoding settings"""
+        raw = "\x1f".join((normalize_text(source), source_lang, target_lang, model_name, decoding))
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def get_many(self, keys: List[str]) -> Dict[str, str]:
+        """Look keys up in the LRU tier, then on disk (blocking; run in executor)"""
+        found = {}
+        missing = []
+
+        for key in keys:
+            value = self.lru.get(key)
+            if value is not None:
+                found[key] = value
+                self.memory_hits += 1
+            else:
+                missing.append(key)
+
+        if missing and self._conn is not None:
+            rows = []
+            with self._lock:
+                # Stay well below SQLite's bound-parameter limit
+                for i in range(0, len(missing), 500):
+                    chunk = missing[i:i + 500]
+                    placeholders = ",".join("?" * len(chunk))
+                    rows.extend(self._conn.execute(
+                        f"SELECT key, translation FROM translations WHERE key IN ({placeholders})",
+                        chunk
+                    ).fetchall())
+            for key, value in rows:
+                found[key] = value
+                self.lru.put(key, value)
+            self.disk_hits += len(rows)
+
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items: Dict[str, str]):
+        """Store new translations in both tiers (blocking; run in executor)"""
+        if not items:
+            return
+        for key, value in items.items():
+            self.lru.put(key, value)
+
+        if self._conn is not None:
+            now = time.time()
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO translations (key, translation, created) VALUES (?, ?, ?)",
+                    [(key, value, now) for key, value in items.items()]
+                )
+                self._conn.commit()
+                self._inserts_since_prune += len(items)
+                if self._inserts_since_prune >= self.prune_every:
+                    self._prune()
+
+    def _prune(self):
+        """Delete expired rows, then the oldest rows over max_rows (caller holds the lock)"""
+        self._inserts_since_prune = 0
+        if self._conn is None or (not self.max_rows and not self.max_age_s):
+            return
+        try:
+            deleted = 0
+            if self.max_age_s:
+                deleted += self._conn.execute(
+                    "DELETE FROM translations WHERE created < ?", (time.time() - self.max_age_s,)
+                ).rowcount
+            if self.max_rows:
+                excess = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0] - self.max_rows
+                if excess > 0:
+                    deleted += self._conn.execute(
+                        "DELETE FROM translations WHERE key IN "
+                        "(SELECT key FROM translations ORDER BY created LIMIT ?)",
+                        (excess,)
+                    ).rowcount
+            self._conn.commit()
+            if deleted:
+                self.pruned += deleted
+                logger.info(f"Translation memory pruned {deleted} rows")
+        except sqlite3.Error as e:
+            logger.warning(f"Translation memory prune failed: {e}")
+
+    def disk_rows(self) -> Optional[int]:
+        """Rows in the on-disk tier, or None when it is disabled"""
+        if self._conn is None:
+            return None
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def stats(self) -> Dict:
+        """Hit/miss statistics for /api/translation/health"""
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        hits = self.memory_hits + self.disk_hits
+        return {
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "memory_entries": len(self.lru),
+            "disk_enabled": self._conn is not None,
+            "disk_rows": self.disk_rows(),
+            "disk_max_rows": self.max_rows or None,
+            "pruned": self.pruned
+        }
+
+    def close(self):
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+            self._conn = None
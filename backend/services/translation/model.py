@@ -4,12 +4,40 @@ Primary Model: facebook/nllb-200-distilled-1.3B (Best multilingual translation)
 """
 import logging
 import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from typing import Optional
+from transformers import AutoTokenizer, StoppingCriteria, StoppingCriteriaList, TextIteratorStreamer
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 import asyncio
+import os
+import threading
+
+from config import settings
+from services import decoding
+from services.inference import load_seq2seq_model
+from services.quantization import TRANSLATION_SAMPLES, apply_precision
+from services.segmentation import split_sentences, split_to_budget, splice
+from services.speculative import DraftModelProposer, SpeculativeStats, speculative_greedy
+from .batcher import TranslationBatcher
+from .memory import TranslationMemory
+from .placeholders import Protected, StreamRestorer, mask, needs_translation, placeholders_intact, restore
+from .vocab_trim import (
+    VOCAB_MAP_FILE,
+    RemappingStreamer,
+    VocabMap,
+    build_trimmed_model,
+    trimmed_model_dir
+)
 
 logger = logging.getLogger(__name__)
 
+class _CancelledCriteria(StoppingCriteria):
+    """Stops generate() once the event is set (the streaming client went away)"""
+    
+    def __init__(self, cancelled: threading.Event):
+        self.cancelled = cancelled
+    
+    def __call__(self, input_ids, scores, **kwargs) -> bool:
+        return self.cancelled.is_set()
+
 class TranslationService:
     """
     Dedicated translation service using NLLB-200.
@@ -28,13 +56,58 @@ class TranslationService:
         
         self.model = None
         self.tokenizer = None
+        self.vocab_map: Optional[VocabMap] = None  # Set when serving a trimmed-vocabulary model
+        self.engine = settings.TRANSLATION_ENGINE
+        self.precision = "fp32"
+        self.precision_score: Optional[float] = None
         self.ready = False
         
+        # Smaller NLLB variant for short / latency-sensitive requests (optional)
+        self.small_model_name = (
+            settings.TRANSLATION_SMALL_MODEL if settings.TRANSLATION_SMALL_MODEL != model_name else ""
+        )
+        self.small_model = None
+        self.small_engine: Optional[str] = None
+        self.routed = {"small": 0, "large": 0}
+        
+        # Draft model for speculative greedy decoding (optional)
+        self.draft_model = None
+        self.speculative_stats = SpeculativeStats()
+        
+        # Fast tokenizers are not safe to reconfigure from several threads at once
+        self._tokenizer_lock = threading.Lock()
+        
+        # Sentence-level translation memory (LRU + SQLite)
+        self.memory: Optional[TranslationMemory] = None
+        if settings.TRANSLATION_MEMORY_ENABLED:
+            self.memory = TranslationMemory(
+                db_path=settings.TRANSLATION_MEMORY_PATH or None,
+                max_entries=settings.TRANSLATION_MEMORY_SIZE,
+                max_rows=settings.TRANSLATION_MEMORY_MAX_ROWS,
+                max_age_s=settings.TRANSLATION_MEMORY_MAX_AGE_DAYS * 86400
+            )
+        
+        # Micro-batching scheduler: concurrent requests share one generate call
+        self.batcher = TranslationBatcher(
+            self._translate_batch_sync,
+            max_batch_size=settings.BATCH_SIZE,
+            max_wait_ms=settings.TRANSLATION_BATCH_WAIT_MS,
+            length_fn=self._count_tokens
+        )
+        
         logger.info(f"Translation Service initialized with {model_name}")
         logger.info(f"Device: {self.device}")
     
-    async def load(self):
-        """Load NLLB-200 model asynchronously"""
+    async def load(self, precision: Optional[str] = None):
+        """
+        Load NLLB-200 model asynchronously.
+        
+        Args:
+            precision: "fp32", "int8" (dynamic quantization of Linear layers) or
+                "bf16". Reduced precision is only kept if it passes the quality
+                gate on the bundled sample set. Defaults to settings.TRANSLATION_PRECISION.
+        """
+        precision = precision or settings.TRANSLATION_PRECISION
         try:
             logger.info("Loading NLLB-200 translation model...")
             
@@ -45,18 +118,59 @@ class TranslationService:
                     self.model_name,
                     cache_dir=self.cache_dir
                 )
-                model = AutoModelForSeq2SeqLM.from_pretrained(
-                    self.model_name,
-                    cache_dir=self.cache_dir
+                model_path, vocab_map = self._prepare_trimmed_vocab(tokenizer, self.model_name)
+                model, engine = load_seq2seq_model(
+                    model_path,
+                    cache_dir=self.cache_dir,
+                    engine=settings.TRANSLATION_ENGINE,
+                    device=self.device
                 )
-                if self.device == "cuda":
-                    model = model.to(self.device)
-                return tokenizer, model
+                return tokenizer, vocab_map, model, engine
+            
+            self.tokenizer, self.vocab_map, self.model, self.engine = await loop.run_in_executor(None, load_model)
+            
+            if self.small_model_name:
+                try:
+                    self.small_model, self.small_engine = await loop.run_in_executor(
+                        None, self._load_variant_sync, self.small_model_name, settings.TRANSLATION_ENGINE
+                    )
+                    logger.info(f"✅ Small translation model loaded: {self.small_model_name} (engine: {self.small_engine})")
+                except Exception as e:
+                    logger.warning(f"Small translation model unavailable, routing everything to {self.model_name}: {e}")
             
-            self.tokenizer, self.model = await loop.run_in_executor(None, load_model)
+            if settings.TRANSLATION_DRAFT_MODEL:
+                if self.engine != "torch":
+                    logger.warning("Speculative decoding is only supported with the torch engine")
+                elif (
+                    settings.TRANSLATION_DRAFT_MODEL == self.small_model_name
+                    and self.small_model is not None
+                    and self.small_engine == "torch"
+                ):
+                    # Same checkpoint as the small tier: share it
+                    self.draft_model = self.small_model
+                else:
+                    try:
+                        self.draft_model, _ = await loop.run_in_executor(
+                            None, self._load_variant_sync, settings.TRANSLATION_DRAFT_MODEL, "torch"
+                        )
+                    except Exception as e:
+                        logger.warning(f"Draft model unavailable, speculative decoding disabled: {e}")
+                if self.draft_model is not None:
+                    logger.info(f"✅ Speculative decoding enabled for single greedy requests (draft: {settings.TRANSLATION_DRAFT_MODEL})")
+            
+            if precision != "fp32":
+                if self.engine == "torch":
+                    self.model, self.precision, self.precision_score = await loop.run_in_executor(
+                        None, self._apply_precision_sync, precision
+                    )
+                else:
+                    logger.warning(f"{precision} precision is only supported with the torch engine")
+            
+            if self.memory is not None:
+                await loop.run_in_executor(None, self.memory.open)
             self.ready = True
             
-            logger.info("✅ NLLB-200 translation model loaded successfully!")
+            logger.info(f"✅ NLLB-200 translation model loaded successfully! (engine: {self.engine}, precision: {self.precision})")
             
         except Exception as e:
             logger.error(f"Failed to load translation model: {e}", exc_info=True)
@@ -66,7 +180,8 @@ class TranslationService:
         self,
         text: str,
         source_lang: str = "eng_Latn",
-        target_lang: str = "ben_Beng"
+        target_lang: str = "ben_Beng",
+        profile: Optional[str] = None
     ) -> Optional[str]:
         """
         Translate text using NLLB-200 model.
@@ -75,76 +190,617 @@ class TranslationService:
             text: Text to translate
             source_lang: Source language code (NLLB format)
             target_lang: Target language code (NLLB format)
+            profile: Decoding profile name (see config.DECODING_PROFILES)
             
         Returns:
             Translated text or None if translation fails
         """
+        document = await self.translate_document(text, source_lang, target_lang, profile)
+        if document is None:
+            return None
+        return document["translated_text"]
+    
+    async def translate_document(
+        self,
+        text: str,
+        source_lang: str = "eng_Latn",
+        target_lang: str = "ben_Beng",
+        profile: Optional[str] = None
+    ) -> Optional[Dict]:
+        """
+        Translate a document of any length.
+        
+        The text is split on sentence boundaries (. ? ! ।), sentences over the
+        token budget are split at word boundaries, and all chunks are translated
+        as parallel batches. Whitespace between chunks is kept verbatim.
+        
+        Returns:
+            Dict with "translated_text", "segments" (source -> target offsets)
+            and "model" (the NLLB variant that served it), or None if translation fails
+            or a language is not supported (see _is_supported_lang)
+        """
         if not self.ready:
             logger.error("Translation service not ready")
             return None
         
         if source_lang == target_lang:
-            return text
+            return {
+                "translated_text": text,
+                "segments": [{
+                    "source_offset": 0,
+                    "source_length": len(text),
+                    "target_offset": 0,
+                    "target_length": len(text)
+                }],
+                "model": None
+            }
+        
+        for lang in (source_lang, target_lang):
+            if not self._is_supported_lang(lang):
+                logger.error(f"Unsupported language code for the loaded model: {lang}")
+                return None
         
         try:
+            profile = decoding.resolve_profile(profile)
             loop = asyncio.get_event_loop()
+            spans, tier = await loop.run_in_executor(None, self._plan_document_sync, text, profile)
             
-            def translate_sync():
-                # Set source language
-                self.tokenizer.src_lang = source_lang
-                
-                # Tokenize
-                inputs = self.tokenizer(
-                    text,
-                    return_tensors="pt",
-                    padding=True,
-                    truncation=True,
-                    max_length=512
-                )
-                
-                if self.device == "cuda":
-                    inputs = {k: v.to(self.device) for k, v in inputs.items()}
-                
-                # Get target language token ID
-                try:
-                    forced_bos_token_id = self.tokenizer.convert_tokens_to_ids(target_lang)
-                except:
-                    # Fallback mapping for common languages
-                    lang_id_map = {
-                        "ben_Beng": 256171,  # Bengali
-                        "eng_Latn": 256047,  # English
-                        "hin_Deva": 256131   # Hindi
-                    }
-                    forced_bos_token_id = lang_id_map.get(target_lang, 256171)
-                
-                # Generate translation
-                translated_tokens = self.model.generate(
-                    **inputs,
-                    forced_bos_token_id=forced_bos_token_id,
-                    max_length=512,
-                    num_beams=5,
-                    early_stopping=True
-                )
-                
-                # Decode
-                translated_text = self.tokenizer.batch_decode(
-                    translated_tokens,
-                    skip_special_tokens=True
-                )[0]
-                
-                return translated_text
-            
-            result = await loop.run_in_executor(None, translate_sync)
-            logger.info(f"Translation: '{text}' -> '{result}'")
-            return result
+            translations = await self._translate_chunks(
+                [text[start:end] for start, end in spans],
+                source_lang,
+                target_lang,
+                profile,
+                tier
+            )
+            
+            translated_text, segments = splice(text, spans, translations)
+            logger.info(f"Translated {len(text)} chars in {len(spans)} chunks ({tier} model)")
+            return {
+                "translated_text": translated_text,
+                "segments": segments,
+                "model": self._tier_model_name(tier)
+            }
             
         except Exception as e:
             logger.error(f"Translation failed: {e}", exc_info=True)
             return None
     
+    async def translate_batch(
+        self,
+        items: List[Dict],
+        profile: Optional[str] = None
+    ) -> List[Dict]:
+        """
+        Translate many independent snippets in one call.
+        
+        All chunks of all items are submitted together; the batcher sorts them
+        by token length into padded buckets of BATCH_SIZE. Results come back in
+        the original order, and a failing item only fails itself.
+        
+        Args:
+            items: Dicts with "text", "source_lang" and "target_lang"
+            
+        Returns:
+            One dict per item with "translated_text" and "model", or "error"
+        """
+        async def translate_item(item: Dict) -> Dict:
+            text = item.get("text") or ""
+            source_lang, target_lang = item["source_lang"], item["target_lang"]
+            if not text.strip():
+                return {"error": "Empty text"}
+            for lang in (source_lang, target_lang):
+                if not self._is_supported_lang(lang):
+                    return {"error": f"Unsupported language code: {lang}"}
+            
+            document = await self.translate_document(text, source_lang, target_lang, profile)
+            if document is None:
+                return {"error": "Translation failed"}
+            return {"translated_text": document["translated_text"], "model": document["model"]}
+        
+        results = await asyncio.gather(
+            *[translate_item(item) for item in items],
+            return_exceptions=True
+        )
+        return [
+            {"error": str(result) or "Translation failed"} if isinstance(result, Exception) else result
+            for result in results
+        ]
+    
+    async def translate_stream(
+        self,
+        text: str,
+        source_lang: str = "eng_Latn",
+        target_lang: str = "ben_Beng",
+        profile: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Translate text, yielding partial output as soon as it is produced.
+        
+        Greedy-profile (e.g. "interactive") single-sentence requests stream token by token;
+        everything else streams sentence chunk by sentence chunk, in order.
+        Concatenating the "text" of all "delta" events gives the full
+        translation, which is also repeated in the final "done" event
+        along with the model that served it.
+        """
+        if not self.ready:
+            raise RuntimeError("Translation service not ready")
+        
+        profile = decoding.resolve_profile(profile)
+        
+        if source_lang == target_lang:
+            yield {"type": "delta", "text": text}
+            yield {"type": "done", "translated_text": text, "model": None}
+            return
+        
+        for lang in (source_lang, target_lang):
+            if not self._is_supported_lang(lang):
+                raise ValueError(f"Unsupported language code: {lang}")
+        
+        loop = asyncio.get_event_loop()
+        spans, tier = await loop.run_in_executor(None, self._plan_document_sync, text, profile)
+        parts = []
+        
+        if decoding.num_beams(profile, "translation") == 1 and len(spans) == 1:
+            start, end = spans[0]
+            if start:
+                parts.append(text[:start])
+                yield {"type": "delta", "text": text[:start]}
+            async for piece in self._stream_tokens(text[start:end], source_lang, target_lang, profile, tier):
+                parts.append(piece)
+                yield {"type": "delta", "text": piece}
+            if text[end:]:
+                parts.append(text[end:])
+                yield {"type": "delta", "text": text[end:]}
+        else:
+            # Submit every chunk at once so they batch, then emit them in order
+            tasks = {}
+            for start, end in spans:
+                chunk = text[start:end]
+                if chunk not in tasks:
+                    tasks[chunk] = asyncio.ensure_future(
+                        self._translate_chunks([chunk], source_lang, target_lang, profile, tier)
+                    )
+            try:
+                cursor = 0
+                for start, end in spans:
+                    translation = (await tasks[text[start:end]])[0]
+                    piece = text[cursor:start] + translation
+                    parts.append(piece)
+                    cursor = end
+                    yield {
+                        "type": "delta",
+                        "text": piece,
+                        "source_offset": start,
+                        "source_length": end - start
+                    }
+                if text[cursor:]:
+                    parts.append(text[cursor:])
+                    yield {"type": "delta", "text": text[cursor:]}
+            finally:
+                # Client went away or a chunk failed: stop the remaining work
+                for task in tasks.values():
+                    task.cancel()
+        
+        yield {"type": "done", "translated_text": ''.join(parts), "model": self._tier_model_name(tier)}
+    
+    async def _stream_tokens(
+        self,
+        chunk: str,
+        source_lang: str,
+        target_lang: str,
+        profile: str,
+        tier: str = "large"
+    ) -> AsyncIterator[str]:
+        """
+        Greedy-decode one chunk, yielding decoded text as tokens arrive.
+        If the consumer stops early (client disconnect), generation is stopped
+        at the next token. Only complete translations whose placeholders all
+        came back once are stored in the translation memory.
+        """
+        masked, protected = self._mask(chunk)
+        restorer = StreamRestorer(protected, self._bengali_digits(target_lang))
+        if not needs_translation(masked):
+            yield restorer.feed(masked) + restorer.flush()
+            return
+        
+        memory_key = TranslationMemory.make_key(
+            masked, source_lang, target_lang, self._tier_model_id(tier), decoding.signature(profile, "translation")
+        )
+        model = self._tier_model(tier)
+        loop = asyncio.get_event_loop()
+        
+        if self.memory is not None:
+            found = await loop.run_in_executor(None, self.memory.get_many, [memory_key])
+            if memory_key in found:
+                yield restorer.feed(found[memory_key]) + restorer.flush()
+                return
+        
+        if self.vocab_map is not None:
+            streamer = RemappingStreamer(self.vocab_map, self.tokenizer, skip_special_tokens=True, timeout=120)
+        else:
+            streamer = TextIteratorStreamer(self.tokenizer, skip_special_tokens=True, timeout=120)
+        cancelled = threading.Event()
+        
+        def generate_sync():
+            try:
+                inputs = self._encode_inputs([masked], source_lang)
+                with torch.inference_mode():
+                    model.generate(
+                        **inputs,
+                        forced_bos_token_id=self._forced_bos_token_id(target_lang),
+                        streamer=streamer,
+                        stopping_criteria=StoppingCriteriaList([_CancelledCriteria(cancelled)]),
+                        **decoding.generation_kwargs(profile, "translation", inputs["input_ids"].shape[1])
+                    )
+            finally:
+                # Unblock the consumer even if generation fails
+                streamer.end()
+        
+        generation = loop.run_in_executor(None, generate_sync)
+        pieces = []
+        try:
+            while True:
+                piece = await loop.run_in_executor(None, next, streamer, None)
+                if piece is None:
+                    break
+                if piece:
+                    pieces.append(piece)
+                    restored = restorer.feed(piece)
+                    if restored:
+                        yield restored
+            await generation
+        finally:
+            # Consumer gone or generation failed: stop decoding instead of running to max_new_tokens
+            cancelled.set()
+        
+        tail = restorer.flush()
+        if tail:
+            yield tail
+        
+        translation = ''.join(pieces).strip()
+        if self.memory is not None and placeholders_intact(translation, len(protected)):
+            await loop.run_in_executor(None, self.memory.put_many, {memory_key: translation})
+    
+    async def _translate_chunks(
+        self,
+        chunks: List[str],
+        source_lang: str,
+        target_lang: str,
+        profile: Optional[str] = None,
+        tier: str = "large"
+    ) -> List[str]:
+        """
+        Translate chunks through the translation memory and the batcher.
+        Protected spans are masked first, so chunks differing only in numbers,
+        URLs etc. share one translation. Repeated chunks are translated once;
+        memory hits skip NLLB entirely.
+        
+        If the model drops or repeats a placeholder, the chunk is translated
+        again unmasked and that output is used when it keeps every protected
+        span verbatim; otherwise the masked translation is repaired by
+        restore(). Such translations are not stored in the memory.
+        """
+        profile = decoding.resolve_profile(profile)
+        key = (source_lang, target_lang, profile, tier)
+        signature = decoding.signature(profile, "translation")
+        model_id = self._tier_model_id(tier)
+        
+        masked = [self._mask(chunk) for chunk in chunks]
+        
+        # Deduplicate by memory key (normalized masked source sentence)
+        chunk_keys = [
+            TranslationMemory.make_key(text, source_lang, target_lang, model_id, signature)
+            for text, _ in masked
+        ]
+        unique = dict(zip(chunk_keys, (text for text, _ in masked)))
+        placeholder_count = {k: len(protected) for k, (_, protected) in zip(chunk_keys, masked)}
+        
+        # Chunks with nothing but placeholders, digits or punctuation pass through
+        found = {k: text for k, text in unique.items() if not needs_translation(text)}
+        
+        loop = asyncio.get_event_loop()
+        lookup = [k for k in unique if k not in found]
+        if self.memory is not None and lookup:
+            found.update(await loop.run_in_executor(None, self.memory.get_many, lookup))
+        
+        missing = [k for k in unique if k not in found]
+        if missing:
+            results = await asyncio.gather(*[
+                self.batcher.submit(key, unique[k]) for k in missing
+            ])
+            new_items = dict(zip(missing, results))
+            found.update(new_items)
+            intact = {k: v for k, v in new_items.items() if placeholders_intact(v, placeholder_count[k])}
+            if self.memory is not None and intact:
+                await loop.run_in_executor(None, self.memory.put_many, intact)
+        
+        # Placeholders lost or duplicated by the model: retry those chunks without masking
+        damaged = [
+            i for i, k in enumerate(chunk_keys)
+            if placeholder_count[k] and not placeholders_intact(found[k], placeholder_count[k])
+        ]
+        unmasked: Dict[int, str] = {}
+        if damaged:
+            logger.warning(f"Placeholders lost in {len(damaged)} chunk(s), retranslating unmasked")
+            retries = await asyncio.gather(*[self.batcher.submit(key, chunks[i]) for i in damaged])
+            for i, text in zip(damaged, retries):
+                if all(original in text for _, original in masked[i][1]):
+                    unmasked[i] = text
+        
+        bengali_digits = self._bengali_digits(target_lang)
+        return [
+            unmasked[i] if i in unmasked else restore(found[k], protected, bengali_digits)
+            for i, (k, (_, protected)) in enumerate(zip(chunk_keys, masked))
+        ]
+    
+    def _mask(self, chunk: str) -> Tuple[str, Protected]:
+        """Mask protected spans when TRANSLATION_PLACEHOLDERS is on"""
+        if not settings.TRANSLATION_PLACEHOLDERS:
+            return chunk, []
+        return mask(chunk)
+    
+    def _bengali_digits(self, target_lang: str) -> bool:
+        return settings.TRANSLATION_BENGALI_DIGITS and target_lang == "ben_Beng"
+    
+    def _apply_precision_sync(self, precision: str):
+        """Quantize / cast the loaded model, guarded by the sample-set quality gate"""
+        def generate_samples(model) -> List[str]:
+            outputs = []
+            for source_lang, target_lang, text in TRANSLATION_SAMPLES:
+                outputs.extend(self._generate_batch(model, [text], source_lang, target_lang, "interactive"))
+            return outputs
+        
+        return apply_precision(
+            self.model,
+            precision,
+            generate_samples,
+            min_score=settings.QUANTIZATION_MIN_CHRF
+        )
+    
+    def route(self, token_count: int, profile: Optional[str]) -> str:
+        """
+        Choose the model tier ("small" or "large") for a request.
+        
+        Only profiles listed in TRANSLATION_SMALL_PROFILES may use the small
+        model. They do when the input is at most TRANSLATION_SMALL_MAX_TOKENS,
+        or at any length while the batcher queue is at least
+        TRANSLATION_OVERLOAD_QUEUE_DEPTH deep.
+        """
+        small_profiles = [p.strip() for p in settings.TRANSLATION_SMALL_PROFILES.split(",") if p.strip()]
+        tier = "large"
+        if self.small_model is not None and decoding.resolve_profile(profile) in small_profiles:
+            if token_count <= settings.TRANSLATION_SMALL_MAX_TOKENS:
+                tier = "small"
+            elif self.batcher.queue_depth >= settings.TRANSLATION_OVERLOAD_QUEUE_DEPTH:
+                tier = "small"
+        self.routed[tier] += 1
+        return tier
+    
+    def _tier_model(self, tier: str):
+        return self.small_model if tier == "small" else self.model
+    
+    def _tier_model_name(self, tier: str) -> str:
+        return self.small_model_name if tier == "small" else self.model_name
+    
+    def _tier_model_id(self, tier: str) -> str:
+        """Model identity used in translation memory keys (name + precision + vocabulary)"""
+        if tier == "small":
+            model_id = f"{self.small_model_name}@fp32"
+        else:
+            model_id = f"{self.model_name}@{self.precision}"
+        if self.vocab_map is not None:
+            model_id += f"+vocab{self.vocab_map.size}"
+        return model_id
+    
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Token counts without special tokens"""
+        if not texts:
+            return []
+        with self._tokenizer_lock:
+            encoded = self.tokenizer(texts, add_special_tokens=False)
+        return [len(ids) for ids in encoded["input_ids"]]
+    
+    def _plan_chunks_sync(self, text: str) -> List[Tuple[int, int]]:
+        """Split text into token-budgeted sentence chunks (runs in executor)"""
+        # Leave room for the language and EOS special tokens
+        budget = min(settings.TRANSLATION_CHUNK_TOKENS, settings.MAX_LENGTH - 2)
+        return split_to_budget(text, split_sentences(text), self._count_tokens, budget)
+    
+    def _plan_document_sync(self, text: str, profile: Optional[str]) -> Tuple[List[Tuple[int, int]], str]:
+        """Chunk a document and pick the model tier for it (runs in executor)"""
+        spans = self._plan_chunks_sync(text)
+        token_count = sum(self._count_tokens([self._mask(text[start:end])[0] for start, end in spans]))
+        return spans, self.route(token_count, profile)
+    
+    def _is_supported_lang(self, lang: str) -> bool:
+        """
+        Whether the tokenizer knows an NLLB language code and, with a trimmed
+        vocabulary, its script was kept (other scripts would encode as <unk>)
+        """
+        if self.tokenizer.convert_tokens_to_ids(lang) == self.tokenizer.unk_token_id:
+            return False
+        return self.vocab_map is None or lang.rsplit("_", 1)[-1] in self._trim_scripts()
+    
+    @staticmethod
+    def _trim_scripts() -> List[str]:
+        """Scripts kept by TRANSLATION_TRIMMED_VOCAB"""
+        return [s.strip() for s in settings.TRANSLATION_TRIM_SCRIPTS.split(",") if s.strip()]
+    
+    def _lang_token_id(self, lang: str) -> int:
+        """Get the NLLB language token ID used as forced BOS"""
+        try:
+            return self.tokenizer.convert_tokens_to_ids(lang)
+        except:
+            # Fallback mapping for common languages
+            lang_id_map = {
+                "ben_Beng": 256171,  # Bengali
+                "eng_Latn": 256047,  # English
+                "hin_Deva": 256131   # Hindi
+            }
+            return lang_id_map.get(lang, 256171)
+    
+    def _forced_bos_token_id(self, target_lang: str) -> int:
+        """Target language token ID in the served model's vocabulary"""
+        token_id = self._lang_token_id(target_lang)
+        if self.vocab_map is not None:
+            token_id = self.vocab_map.to_new(token_id)
+        return token_id
+    
+    def _encode_inputs(self, texts: List[str], source_lang: str) -> Dict:
+        """Tokenize texts as one padded batch for the served model"""
+        with self._tokenizer_lock:
+            # Set source language
+            self.tokenizer.src_lang = source_lang
+            
+            inputs = self.tokenizer(
+                texts,
+                return_tensors="pt",
+                padding=True,
+                truncation=True,
+                max_length=settings.MAX_LENGTH
+            )
+        
+        inputs = dict(inputs)
+        if self.vocab_map is not None:
+            inputs["input_ids"] = self.vocab_map.encode(inputs["input_ids"])
+        
+        if self.device == "cuda":
+            inputs = {k: v.to(self.device) for k, v in inputs.items()}
+        return inputs
+    
+    def _load_variant_sync(self, model_name: str, engine: str):
+        """
+        Load another NLLB checkpoint (small tier or draft model) that shares
+        the main tokenizer (runs in executor). With a trimmed vocabulary it is
+        trimmed to the same scripts, so all variants use the same token ids.
+        
+        Returns:
+            (model, engine actually used)
+        """
+        logger.info(f"Loading {model_name}...")
+        model_path, _ = self._prepare_trimmed_vocab(self.tokenizer, model_name)
+        return load_seq2seq_model(
+            model_path,
+            cache_dir=self.cache_dir,
+            engine=engine,
+            device=self.device
+        )
+    
+    def _prepare_trimmed_vocab(self, tokenizer, model_name: str) -> Tuple[str, Optional[VocabMap]]:
+        """
+        Resolve which checkpoint to load. With TRANSLATION_TRIMMED_VOCAB the
+        trimmed model under MODEL_CACHE_DIR is used (built on first run).
+        """
+        if not settings.TRANSLATION_TRIMMED_VOCAB:
+            return model_name, None
+        
+        scripts = self._trim_scripts()
+        model_dir = trimmed_model_dir(model_name, self.cache_dir, scripts)
+        if not os.path.exists(os.path.join(model_dir, VOCAB_MAP_FILE)):
+            logger.info(f"Building trimmed-vocabulary model for {model_name} (one-time)...")
+            build_trimmed_model(model_name, self.cache_dir, scripts)
+        
+        vocab_map = VocabMap.load(model_dir, tokenizer.unk_token_id)
+        logger.info(f"Using trimmed vocabulary: {vocab_map.size} tokens ({', '.join(scripts)})")
+        return model_dir, vocab_map
+    
+    def _translate_batch_sync(self, key: Tuple[str, str, str, str], texts: List[str]) -> List[str]:
+        """Translate a batch of texts sharing one language pair, profile and model tier (runs in executor)"""
+        source_lang, target_lang, profile, tier = key
+        return self._generate_batch(self._tier_model(tier), texts, source_lang, target_lang, profile)
+    
+    def _generate_batch(
+        self,
+        model,
+        texts: List[str],
+        source_lang: str,
+        target_lang: str,
+        profile: Optional[str] = None
+    ) -> List[str]:
+        """
+        Run one padded generate call on the given model (blocking).
+        A lone greedy text on the main model is decoded speculatively instead;
+        larger batches keep padded generation, since speculation decodes one
+        text at a time and would serialize them.
+        """
+        if (
+            self.draft_model is not None
+            and model is self.model
+            and len(texts) == 1
+            and decoding.num_beams(profile, "translation") == 1
+        ):
+            return [self._generate_speculative(texts[0], source_lang, target_lang, profile)]
+        
+        inputs = self._encode_inputs(texts, source_lang)
+        
+        # Generate translations
+        with torch.inference_mode():
+            translated_tokens = model.generate(
+                **inputs,
+                forced_bos_token_id=self._forced_bos_token_id(target_lang),
+                **decoding.generation_kwargs(profile, "translation", inputs["input_ids"].shape[1])
+            )
+        
+        if self.vocab_map is not None:
+            translated_tokens = self.vocab_map.decode(translated_tokens)
+        
+        # Decode
+        return self.tokenizer.batch_decode(
+            translated_tokens,
+            skip_special_tokens=True
+        )
+    
+    def _generate_speculative(
+        self,
+        text: str,
+        source_lang: str,
+        target_lang: str,
+        profile: Optional[str] = None
+    ) -> str:
+        """
+        Greedy-decode one text with the draft model proposing tokens and the
+        main model verifying them (blocking). Same output as plain greedy.
+        """
+        inputs = self._encode_inputs([text], source_lang)
+        generation_config = self.model.generation_config
+        eos_token_id = generation_config.eos_token_id
+        if isinstance(eos_token_id, list):
+            eos_token_id = eos_token_id[0]
+        
+        # generate() starts with the decoder start token and forces the target language next;
+        # the language token counts toward max_new_tokens there too
+        prefix = [generation_config.decoder_start_token_id, self._forced_bos_token_id(target_lang)]
+        budget = decoding.max_new_tokens(profile, inputs["input_ids"].shape[1]) - 1
+        
+        with torch.inference_mode():
+            proposer = DraftModelProposer(
+                self.draft_model, inputs["input_ids"], inputs["attention_mask"], eos_token_id
+            )
+            sequence = speculative_greedy(
+                self.model,
+                inputs["input_ids"],
+                inputs["attention_mask"],
+                prefix,
+                proposer,
+                max_new_tokens=budget,
+                eos_token_id=eos_token_id,
+                num_draft_tokens=settings.TRANSLATION_DRAFT_TOKENS,
+                stats=self.speculative_stats
+            )
+        
+        tokens = torch.tensor([sequence])
+        if self.vocab_map is not None:
+            tokens = self.vocab_map.decode(tokens)
+        return self.tokenizer.batch_decode(tokens, skip_special_tokens=True)[0]
+    
     def cleanup(self):
         """Cleanup resources"""
         logger.info("Cleaning up translation service...")
+        self.batcher.close()
+        if self.memory is not None:
+            self.memory.close()
+        self.draft_model = None
+        self.small_model = None
         if self.model:
             del self.model
             del self.tokenizer
@@ -0,0 +1,168 @@
+"""
+Placeholder Masking for Translation
+Replaces URLs, email addresses, numbers/dates, code and Latin identifiers with
+compact placeholders ([1], [2], ...) before NLLB sees the text, and puts the
+original spans back (byte-exact) after decoding.
+"""
+import re
+from typing import List, Tuple
+
+# (kind, original text) per placeholder; placeholder [n] is entry n-1
+Protected = List[Tuple[str, str]]
+
+_BENGALI_DIGITS = str.maketrans("0123456789", "০১২৩৪৫৬৭৮৯")
+_ASCII_DIGITS = str.maketrans("০১২৩৪৫৬৭৮৯", "0123456789")
+
+_PATTERNS = [
+    # Existing bracketed numbers would collide with our placeholders
+    ("literal", r"\[\s*[0-9০-৯]+\s*\]"),
+    ("code", r"`[^`\n]+`"),
+    ("url", r"(?:https?://|www\.)[^\s<>\"'`]+[^\s<>\"'`.,;:!?)\]।]"),
+    ("email", r"[A-Za-z0-9._%+-]+@[A-Za-z0-9-]+(?:\.[A-Za-z0-9-]+)+"),
+    # Code-like identifiers only, so ordinary words stay translatable:
+    # snake_case, lowercase dotted.names, file.ext, camelCase, and letter-first
+    # letter+digit codes that are all uppercase (A4, MP3) or mixed case (GPT4o).
+    # Ordinals, units, times and decades (2nd, 100m, 5pm, 1990s, 4G) and
+    # abbreviations such as Mr.Rahman are left to the model.
+    ("identifier", r"\b[A-Za-z]\w*_\w+\b"),
+    ("identifier", r"\b[a-z_]\w+(?:\.[a-z_]\w+)+\b"),
+    ("identifier", r"\b[A-Za-z_][\w-]+\.[a-z][a-z0-9]{0,4}\b"),
+    ("identifier", r"\b[a-z]+[A-Z]\w*\b"),
+    ("identifier", r"\b[A-Z][A-Z0-9]*[0-9][A-Z0-9]*\b"),
+    ("identifier", r"\b(?=[A-Za-z0-9]*[0-9])(?=[A-Za-z0-9]*[A-Z][A-Za-z0-9]*[A-Z])[A-Za-z][A-Za-z0-9]+\b"),
+    # Numbers, dates and times: 42, 3.14, 1,000,000, 12/05/2024, 10:30 (ASCII or
+    # Bengali digits); not when glued to letters (2nd, 5pm, utf8)
+    ("number", r"(?<![A-Za-z0-9_])[0-9]+(?:[.,:/-][0-9]+)*(?![A-Za-z0-9_]|[.,:/-][0-9])"),
+    ("number", r"[০-৯]+(?:[.,:/-][০-৯]+)*"),
+]
+
+_MASK_RE = re.compile("|".join(f"(?P<g{i}>{pattern})" for i, (_, pattern) in enumerate(_PATTERNS)))
+_PLACEHOLDER_RE = re.compile(r"\[\s*([0-9০-৯]+)\s*\]")
+_WORD_RE = re.compile(r"[^\W\d_]")
+_SPACES_RE = re.compile(r" {2,}")
+_TRAILING_PUNCT_RE = re.compile(r"[\s।.!?]*$")
+
+
+def mask(text: str) -> Tuple[str, Protected]:
+    """
+    Replace protected spans with numbered placeholders.
+
+    Returns:
+        (masked text, protected spans in placeholder order)
+    """
+    protected: Protected = []
+
+    def substitute(match: re.Match) -> str:
+        kind = _PATTERNS[int(match.lastgroup[1:])][0]
+        protected.append((kind, match.group(0)))
+        return f"[{len(protected)}]"
+
+    return _MASK_RE.sub(substitute, text), protected
+
+
+def placeholder_counts(text: str, count: int) -> List[int]:
+    """How often each of the placeholders [1]..[count] occurs in a translation"""
+    seen = [0] * count
+    for match in _PLACEHOLDER_RE.finditer(text):
+        index = int(match.group(1).translate(_ASCII_DIGITS)) - 1
+        if 0 <= index < count:
+            seen[index] += 1
+    return seen
+
+
+def placeholders_intact(text: str, count: int) -> bool:
+    """Whether every placeholder came back from the model exactly once"""
+    return all(n == 1 for n in placeholder_counts(text, count))
+
+
+def _substitute(text: str, protected: Protected, bengali_digits: bool, seen: set) -> str:
+    """Expand placeholders; repeats of an already expanded placeholder are dropped"""
+    dropped = False
+
+    def substitute(match: re.Match) -> str:
+        nonlocal dropped
+        index = int(match.group(1).translate(_ASCII_DIGITS)) - 1
+        if not 0 <= index < len(protected):
+            return match.group(0)
+        if index in seen:
+            dropped = True
+            return ""
+        seen.add(index)
+        kind, original = protected[index]
+        if bengali_digits and kind == "number":
+            return original.translate(_BENGALI_DIGITS)
+        return original
+
+    text = _PLACEHOLDER_RE.sub(substitute, text)
+    return _SPACES_RE.sub(" ", text) if dropped else text
+
+
+def _append_missing(text: str, protected: Protected, bengali_digits: bool, seen: set) -> str:
+    """Re-insert spans whose placeholder the model dropped, before the final punctuation"""
+    missing = [i for i in range(len(protected)) if i not in seen]
+    if not missing:
+        return text
+    seen.update(missing)
+    spans = " ".join(
+        original.translate(_BENGALI_DIGITS) if bengali_digits and kind == "number" else original
+        for kind, original in (protected[i] for i in missing)
+    )
+    body = _TRAILING_PUNCT_RE.sub("", text)
+    tail = text[len(body):]
+    return f"{body} {spans}{tail}" if body else f"{spans}{tail}"
+
+
+def restore(text: str, protected: Protected, bengali_digits: bool = False) -> str:
+    """
+    Put protected spans back into a translation of masked text.
+
+    NLLB may render a placeholder as [১] or [ 1 ]; both are recognised.
+    Every span comes back exactly once: a repeated placeholder is expanded
+    only the first time, and spans whose placeholder was dropped are
+    re-inserted at the end of the sentence.
+    With bengali_digits, numbers (not URLs, code or identifiers) are
+    converted to Bengali numerals.
+    """
+    if not protected:
+        return text
+    seen: set = set()
+    text = _substitute(text, protected, bengali_digits, seen)
+    return _append_missing(text, protected, bengali_digits, seen)
+
+
+def needs_translation(masked: str) -> bool:
+    """Whether masked text has any words left for the model to translate"""
+    return bool(_WORD_RE.search(_PLACEHOLDER_RE.sub("", masked)))
+
+
+class StreamRestorer:
+    """
+    Restores placeholders in streamed output, holding back a possibly split
+    placeholder. Repeats are dropped as they stream; spans the model never
+    produced are emitted by flush().
+    """
+
+    def __init__(self, protected: Protected, bengali_digits: bool = False):
+        self.protected = protected
+        self.bengali_digits = bengali_digits
+        self._pending = ""
+        self._seen: set = set()
+
+    def feed(self, piece: str) -> str:
+        text = self._pending + piece
+        cut = text.rfind("[")
+        if cut != -1 and "]" not in text[cut:]:
+            text, self._pending = text[:cut], text[cut:]
+        else:
+            self._pending = ""
+        if not self.protected:
+            return text
+        return _substitute(text, self.protected, self.bengali_digits, self._seen)
+
+    def flush(self) -> str:
+        text, self._pending = self._pending, ""
+        if not self.protected:
+            return text
+        text = _substitute(text, self.protected, self.bengali_digits, self._seen)
+        missing = _append_missing("", self.protected, self.bengali_digits, self._seen)
+        return f"{text} {missing}" if missing else text
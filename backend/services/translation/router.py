@@ -3,10 +3,13 @@ Translation API Router
 Dedicated endpoint for NLLB-200 translation service
 """
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+import json
 import logging
 
+from config import settings
 from .model import get_translation_service
 
 router = APIRouter()
@@ -16,11 +19,46 @@ class TranslateRequest(BaseModel):
     text: str
     source_lang: Optional[str] = "eng_Latn"
     target_lang: Optional[str] = "ben_Beng"
+    profile: Optional[str] = None  # Decoding profile: "interactive", "balanced", "quality"
+    include_segments: bool = False  # Return source -> target chunk offsets
+
+class TranslationSegment(BaseModel):
+    source_offset: int
+    source_length: int
+    target_offset: int
+    target_length: int
 
 class TranslateResponse(BaseModel):
     translated_text: str
     source_lang: str
     target_lang: str
+    model: Optional[str] = None  # NLLB variant that served the request
+    segments: Optional[List[TranslationSegment]] = None
+
+class BatchTranslateItem(BaseModel):
+    text: str
+    source_lang: Optional[str] = "eng_Latn"
+    target_lang: Optional[str] = "ben_Beng"
+
+class BatchTranslateRequest(BaseModel):
+    items: List[BatchTranslateItem]
+    profile: Optional[str] = None
+
+class BatchTranslateResult(BaseModel):
+    translated_text: Optional[str] = None
+    source_lang: str
+    target_lang: str
+    model: Optional[str] = None
+    error: Optional[str] = None
+
+class BatchTranslateResponse(BaseModel):
+    results: List[BatchTranslateResult]
+
+class TranslateStreamRequest(BaseModel):
+    text: str
+    source_lang: Optional[str] = "eng_Latn"
+    target_lang: Optional[str] = "ben_Beng"
+    profile: Optional[str] = None  # Greedy profiles ("interactive") stream token by token
 
 class DetectLanguageRequest(BaseModel):
     text: str
@@ -34,6 +72,7 @@ async def translate_text(request: TranslateRequest):
     """
     Translate text using NLLB-200 AI model.
     Primary model: facebook/nllb-200-distilled-1.3B
+    Long documents are translated sentence-chunk by sentence-chunk (no truncation).
     """
     try:
         service = get_translation_service()
@@ -44,22 +83,25 @@ async def translate_text(request: TranslateRequest):
                 detail="Translation service not ready. Models still loading."
             )
         
-        translated = await service.translate(
+        document = await service.translate_document(
             request.text,
             request.source_lang,
-            request.target_lang
+            request.target_lang,
+            profile=request.profile
         )
         
-        if translated is None:
+        if document is None:
             raise HTTPException(
                 status_code=500,
                 detail="Translation failed"
             )
         
         return TranslateResponse(
-            translated_text=translated,
+            translated_text=document["translated_text"],
             source_lang=request.source_lang,
-            target_lang=request.target_lang
+            target_lang=request.target_lang,
+            model=document["model"],
+            segments=document["segments"] if request.include_segments else None
         )
     
     except HTTPException:
@@ -68,6 +110,81 @@ async def translate_text(request: TranslateRequest):
         logger.error(f"Translation endpoint failed: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/translate/batch", response_model=BatchTranslateResponse)
+async def translate_batch(request: BatchTranslateRequest):
+    """
+    Translate many snippets (headlines, captions, table cells) in one request.
+    Inputs are length-bucketed into padded batches; results keep the input order.
+    Errors are reported per item and do not fail the whole batch.
+    """
+    service = get_translation_service()
+    
+    if not service.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Translation service not ready. Models still loading."
+        )
+    
+    if len(request.items) > settings.TRANSLATION_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Too many items (max {settings.TRANSLATION_BATCH_MAX_ITEMS})"
+        )
+    
+    try:
+        results = await service.translate_batch(
+            [item.model_dump() for item in request.items],
+            profile=request.profile
+        )
+        
+        return BatchTranslateResponse(results=[
+            BatchTranslateResult(
+                source_lang=item.source_lang,
+                target_lang=item.target_lang,
+                **result
+            )
+            for item, result in zip(request.items, results)
+        ])
+    
+    except Exception as e:
+        logger.error(f"Batch translation endpoint failed: {e}", exc_info=True)
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/translate/stream")
+async def translate_stream(request: TranslateStreamRequest):
+    """
+    Stream a translation as Server-Sent Events.
+    Greedy requests stream token by token, longer documents sentence by sentence.
+    Each event is a JSON object: {"type": "delta", "text": ...}, then
+    {"type": "done", "translated_text": ..., "model": ...} (or {"type": "error", ...}).
+    """
+    service = get_translation_service()
+    
+    if not service.ready:
+        raise HTTPException(
+            status_code=503,
+            detail="Translation service not ready. Models still loading."
+        )
+    
+    async def event_stream():
+        try:
+            async for event in service.translate_stream(
+                request.text,
+                request.source_lang,
+                request.target_lang,
+                profile=request.profile
+            ):
+                yield f"data: {json.dumps(event, ensure_ascii=False)}\n\n"
+        except Exception as e:
+            logger.error(f"Streaming translation failed: {e}", exc_info=True)
+            yield f"data: {json.dumps({'type': 'error', 'detail': 'Translation failed'})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @router.post("/detect-language", response_model=DetectLanguageResponse)
 async def detect_language(request: DetectLanguageRequest):
     """Detect language of input text"""
@@ -109,6 +226,16 @@ async def translation_health():
         "status": "healthy" if service.ready else "loading",
         "model": service.model_name,
         "device": service.device,
-        "ready": service.ready
+        "engine": service.engine,
+        "precision": service.precision,
+        "precision_gate_chrf": service.precision_score,
+        "vocab_size": service.vocab_map.size if service.vocab_map else None,
+        "ready": service.ready,
+        "small_model": service.small_model_name if service.small_model is not None else None,
+        "routing": service.routed,
+        "draft_model": settings.TRANSLATION_DRAFT_MODEL if service.draft_model is not None else None,
+        "speculative": service.speculative_stats.as_dict(),
+        "scheduler": service.batcher.stats(),
+        "memory": service.memory.stats() if service.memory else None
     }
 
@@ -0,0 +1,167 @@
+"""
+Target-Vocabulary Trimming for NLLB-200
+Builds a copy of the model whose shared embeddings and output projection only
+cover the tokens needed for Bengali and our common source scripts, and maps
+token ids between the full tokenizer and the trimmed model at runtime.
+
+Build once (or let TranslationService build it on first load):
+    python -m services.translation.vocab_trim
+"""
+import json
+import logging
+import os
+from typing import Iterable, List
+
+import torch
+from transformers import AutoModelForSeq2SeqLM, AutoTokenizer, TextIteratorStreamer
+
+from services.segmentation import SCRIPT_RANGES
+
+logger = logging.getLogger(__name__)
+
+VOCAB_MAP_FILE = "vocab_map.json"
+
+# Always kept: digits, ASCII/Latin-1 punctuation and symbols, the danda and
+# double danda (Bengali sentence ends), general punctuation, currency signs,
+# and the zero-width joiners used in Bengali
+COMMON_RANGES = [
+    (0x0020, 0x0040), (0x005B, 0x0060), (0x007B, 0x007E),
+    (0x00A0, 0x00BF), (0x0964, 0x0965), (0x200C, 0x206F), (0x20A0, 0x20CF),
+]
+
+
+def trimmed_model_dir(model_name: str, cache_dir: str, scripts: Iterable[str]) -> str:
+    """Where the trimmed model for a checkpoint and script set is stored"""
+    suffix = "-".join(sorted(scripts))
+    return os.path.join(cache_dir, "trimmed", f"{model_name.replace('/', '--')}--{suffix}")
+
+
+def _allowed(char: str, ranges) -> bool:
+    code = ord(char)
+    return any(low <= code <= high for low, high in ranges)
+
+
+def select_vocabulary(tokenizer, scripts: Iterable[str]) -> List[int]:
+    """
+    Token ids to keep: all special and language-code tokens, plus every
+    piece made only of characters from the requested scripts or common
+    punctuation/digits.
+    """
+    ranges = list(COMMON_RANGES)
+    for script in scripts:
+        if script not in SCRIPT_RANGES:
+            raise ValueError(f"Unknown script '{script}' (known: {', '.join(SCRIPT_RANGES)})")
+        ranges.extend(SCRIPT_RANGES[script])
+
+    keep = set(tokenizer.all_special_ids)
+    for token, token_id in tokenizer.get_vocab().items():
+        piece = token.replace("▁", "")
+        if all(_allowed(char, ranges) for char in piece):
+            keep.add(token_id)
+    return sorted(keep)
+
+
+def build_trimmed_model(model_name: str, cache_dir: str, scripts: Iterable[str]) -> str:
+    """
+    Trim the shared embeddings and tied output projection of an NLLB model
+    to the selected vocabulary and save it (with its id map) under cache_dir.
+
+    Returns:
+        Directory of the trimmed model
+    """
+    scripts = sorted(scripts)
+    out_dir = trimmed_model_dir(model_name, cache_dir, scripts)
+
+    tokenizer = AutoTokenizer.from_pretrained(model_name, cache_dir=cache_dir)
+    model = AutoModelForSeq2SeqLM.from_pretrained(model_name, cache_dir=cache_dir)
+
+    keep = select_vocabulary(tokenizer, scripts)
+    old_to_new = {old: new for new, old in enumerate(keep)}
+    logger.info(f"Trimming vocabulary {model.config.vocab_size} -> {len(keep)} tokens ({', '.join(scripts)})")
+
+    # Slice the shared embedding in place (keeps any embedding scaling of the
+    # module class) and re-link encoder/decoder to it
+    embeddings = model.get_input_embeddings()
+    embeddings.weight = torch.nn.Parameter(embeddings.weight.data[torch.tensor(keep)].clone())
+    embeddings.num_embeddings = len(keep)
+    embeddings.padding_idx = old_to_new.get(model.config.pad_token_id)
+    model.set_input_embeddings(embeddings)
+
+    # Output projection stays tied to the trimmed shared embeddings
+    head = torch.nn.Linear(embeddings.embedding_dim, len(keep), bias=False)
+    head.weight = embeddings.weight
+    model.set_output_embeddings(head)
+    model.config.vocab_size = len(keep)
+
+    # Special ids used by generate() must point into the trimmed vocabulary
+    for config in (model.config, model.generation_config):
+        for attr in ("pad_token_id", "bos_token_id", "eos_token_id", "decoder_start_token_id"):
+            value = getattr(config, attr, None)
+            if isinstance(value, int) and value in old_to_new:
+                setattr(config, attr, old_to_new[value])
+
+    os.makedirs(out_dir, exist_ok=True)
+    model.save_pretrained(out_dir)
+    tokenizer.save_pretrained(out_dir)
+    with open(os.path.join(out_dir, VOCAB_MAP_FILE), "w", encoding="utf-8") as f:
+        json.dump({
+            "source_model": model_name,
+            "scripts": scripts,
+            "original_vocab_size": len(tokenizer),
+            "kept_ids": keep
+        }, f)
+
+    logger.info(f"✅ Trimmed model saved to {out_dir}")
+    return out_dir
+
+
+class VocabMap:
+    """Maps token ids between the full NLLB tokenizer and a trimmed model"""
+
+    def __init__(self, kept_ids: List[int], original_vocab_size: int, unk_id: int):
+        self.size = len(kept_ids)
+        self.new_to_old = torch.tensor(kept_ids, dtype=torch.long)
+
+        new_unk = kept_ids.index(unk_id)
+        self.old_to_new = torch.full((max(original_vocab_size, max(kept_ids) + 1),), new_unk, dtype=torch.long)
+        self.old_to_new[self.new_to_old] = torch.arange(self.size, dtype=torch.long)
+
+    @classmethod
+    def load(cls, model_dir: str, unk_id: int) -> "VocabMap":
+        with open(os.path.join(model_dir, VOCAB_MAP_FILE), encoding="utf-8") as f:
+            data = json.load(f)
+        return cls(data["kept_ids"], data["original_vocab_size"], unk_id)
+
+    def encode(self, ids: torch.Tensor) -> torch.Tensor:
+        """Full-vocabulary ids -> trimmed ids (unknown tokens become <unk>)"""
+        return self.old_to_new.to(ids.device)[ids]
+
+    def decode(self, ids: torch.Tensor) -> torch.Tensor:
+        """Trimmed ids -> full-vocabulary ids"""
+        return self.new_to_old.to(ids.device)[ids]
+
+    def to_new(self, token_id: int) -> int:
+        return int(self.old_to_new[token_id])
+
+
+class RemappingStreamer(TextIteratorStreamer):
+    """TextIteratorStreamer for a trimmed model: maps ids back before decoding"""
+
+    def __init__(self, vocab_map: VocabMap, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.vocab_map = vocab_map
+
+    def put(self, value):
+        super().put(self.vocab_map.decode(value))
+
+
+if __name__ == "__main__":
+    # Run from backend/: python -m services.translation.vocab_trim
+    from config import settings
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    build_trimmed_model(
+        settings.TRANSLATION_MODEL,
+        settings.MODEL_CACHE_DIR,
+        [s.strip() for s in settings.TRANSLATION_TRIM_SCRIPTS.split(",") if s.strip()]
+    )
@@ -5,6 +5,8 @@ NO hardcoded data - pure AI transliteration
 import logging
 from typing import List, Tuple
 
+from services.normalization import normalize
+
 logger = logging.getLogger(__name__)
 
 class TransliterationService:
@@ -27,6 +29,10 @@ class TransliterationService:
             logger.error("Install with: pip install indic-transliteration")
             self.ready = False
     
+    def _to_bengali(self, text: str, scheme) -> str:
+        """Transliterate to Bengali script in normalized form, so variants compare by canonical spelling"""
+        return normalize(self.transliterate(text, scheme, self.sanscript.BENGALI))
+    
     def english_to_bengali(self, text: str, max_suggestions: int = 4) -> List[Tuple[str, float]]:
         """
         Transliterate English text to Bengali script.
@@ -40,26 +46,26 @@ class TransliterationService:
             suggestions = []
             
             # Primary: ITRANS scheme (most accurate for phonetic)
-            result1 = self.transliterate(text, self.sanscript.ITRANS, self.sanscript.BENGALI)
+            result1 = self._to_bengali(text, self.sanscript.ITRANS)
             suggestions.append((result1, 1.0))
             
             # Variation 1: Try replacing 'o' with 'u' for different pronunciation
             if 'o' in text.lower():
                 variant = text.lower().replace('o', 'u')
-                result2 = self.transliterate(variant, self.sanscript.ITRANS, self.sanscript.BENGALI)
+                result2 = self._to_bengali(variant, self.sanscript.ITRANS)
                 if result2 != result1:
                     suggestions.append((result2, 0.9))
             
             # Variation 2: Try long 'a' (aa) for different pronunciation
             if 'a' in text.lower() and len(text) > 2:
                 variant = text.lower().replace('a', 'aa')
-                result3 = self.transliterate(variant, self.sanscript.ITRANS, self.sanscript.BENGALI)
+                result3 = self._to_bengali(variant, self.sanscript.ITRANS)
                 if result3 not in [s[0] for s in suggestions]:
                     suggestions.append((result3, 0.85))
             
             # Variation 3: Try HK scheme as alternative
             try:
-                result4 = self.transliterate(text, self.sanscript.HK, self.sanscript.BENGALI)
+                result4 = self._to_bengali(text, self.sanscript.HK)
                 if result4 not in [s[0] for s in suggestions]:
                     suggestions.append((result4, 0.8))
             except Exception:
@@ -67,7 +73,7 @@ class TransliterationService:
             
             # Variation 4: Try SLP1 scheme
             try:
-                result5 = self.transliterate(text, self.sanscript.SLP1, self.sanscript.BENGALI)
+                result5 = self._to_bengali(text, self.sanscript.SLP1)
                 if result5 not in [s[0] for s in suggestions]:
                     suggestions.append((result5, 0.75))
             except Exception:
@@ -90,18 +96,21 @@ class TransliterationService:
         
         try:
             suggestions = [(bengali_text, 1.0)]
+            # Canonical form, so ZWJ/ZWNJ or nukta encoding differences neither break
+            # reverse transliteration nor come back as "variations"
+            canonical = normalize(bengali_text)
             
             # Try reverse transliteration to get romanized form
             try:
                 # Bengali to ITRANS
-                roman = self.transliterate(bengali_text, self.sanscript.BENGALI, self.sanscript.ITRANS)
+                roman = self.transliterate(canonical, self.sanscript.BENGALI, self.sanscript.ITRANS)
                 
                 # Now generate variations of the romanized text
                 variations = [roman, roman + 'a', roman + 'i', roman.replace('a', 'aa')]
                 
                 for var in variations:
-                    result = self.transliterate(var, self.sanscript.ITRANS, self.sanscript.BENGALI)
-                    if result not in [s[0] for s in suggestions] and result != bengali_text:
+                    result = self._to_bengali(var, self.sanscript.ITRANS)
+                    if result not in [s[0] for s in suggestions] and result != canonical:
                         suggestions.append((result, 0.8))
                         if len(suggestions) >= max_suggestions:
                             break
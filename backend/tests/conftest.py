@@ -0,0 +1,25 @@
+"""
+Shared test helpers.
+Service packages import their FastAPI routers (and through them the models)
+in __init__, so the pure-Python modules under test are loaded from their
+files directly.
+"""
+import importlib.util
+import os
+import sys
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def load_module(relative_path: str):
+    """Import a backend module by path (e.g. "services/spelling/trie.py") without its package"""
+    name = "_test_" + relative_path.replace("/", "_")[:-3]
+    if name in sys.modules:
+        return sys.modules[name]
+    spec = importlib.util.spec_from_file_location(name, os.path.join(BACKEND_DIR, relative_path))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
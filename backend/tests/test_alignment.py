@@ -0,0 +1,84 @@
+import random
+
+import pytest
+
+from services.alignment import align, diff, matching_blocks, tokenize
+
+
+def lcs_length(a, b):
+    """Reference LCS by dynamic programming"""
+    row = [0] * (len(b) + 1)
+    for x in a:
+        previous = 0
+        for j, y in enumerate(b):
+            current = row[j + 1]
+            row[j + 1] = previous + 1 if x == y else max(row[j + 1], row[j])
+            previous = current
+    return row[-1]
+
+
+def apply_opcodes(a, b, opcodes):
+    out = []
+    for tag, a_start, a_end, b_start, b_end in opcodes:
+        out.extend(a[a_start:a_end] if tag == "equal" else b[b_start:b_end])
+    return out
+
+
+def random_pairs(count=300, seed=7):
+    rng = random.Random(seed)
+    for _ in range(count):
+        alphabet = "abcd"[:rng.randint(1, 4)]
+        a = [rng.choice(alphabet) for _ in range(rng.randint(0, 20))]
+        b = [rng.choice(alphabet) for _ in range(rng.randint(0, 20))]
+        yield a, b
+
+
+def test_matching_blocks_are_a_longest_common_subsequence():
+    for a, b in random_pairs():
+        blocks = matching_blocks(a, b)
+        assert sum(length for _, _, length in blocks) == lcs_length(a, b)
+        for a_index, b_index, length in blocks:
+            assert a[a_index:a_index + length] == b[b_index:b_index + length]
+
+
+def test_opcodes_rebuild_the_target_and_cover_both_sequences():
+    for a, b in random_pairs():
+        opcodes = diff(a, b)
+        assert apply_opcodes(a, b, opcodes) == b
+        a_pos = b_pos = 0
+        for tag, a_start, a_end, b_start, b_end in opcodes:
+            assert (a_start, b_start) == (a_pos, b_pos)
+            assert tag in ("equal", "replace", "delete", "insert")
+            a_pos, b_pos = a_end, b_end
+        assert (a_pos, b_pos) == (len(a), len(b))
+
+
+@pytest.mark.parametrize("a, b, expected", [
+    ([], [], []),
+    (["x"], ["x"], [("equal", 0, 1, 0, 1)]),
+    (["x", "y"], ["x", "z"], [("equal", 0, 1, 0, 1), ("replace", 1, 2, 1, 2)]),
+    (["x", "y", "z"], ["x", "z"], [("equal", 0, 1, 0, 1), ("delete", 1, 2, 1, 1), ("equal", 2, 3, 1, 2)]),
+    (["x"], ["w", "x"], [("insert", 0, 0, 0, 1), ("equal", 0, 1, 1, 2)]),
+])
+def test_diff_examples(a, b, expected):
+    assert diff(a, b) == expected
+
+
+def test_tokenize_offsets():
+    text = "আমি  ভাত খাই"
+    assert [text[start:end] for _, start, end in tokenize(text)] == ["আমি", "ভাত", "খাই"]
+
+
+def test_align_edits_point_into_the_original():
+    original = "আমি ভাত খাই গেলাম"
+    edits = align(original, "আমি ভাত খেয়ে গেলাম")
+    assert len(edits) == 1
+    edit = edits[0]
+    assert edit["op"] == "replace"
+    assert original[edit["offset"]:edit["offset"] + edit["length"]] == "খাই"
+    assert edit["replacement"] == "খেয়ে"
+
+
+def test_align_anchors_insertions_to_a_neighbour():
+    edits = align("আমি খাই", "আমি ভাত খাই")
+    assert edits == [{"op": "insert", "offset": 0, "length": 3, "original_text": "আমি", "replacement": "আমি ভাত"}]
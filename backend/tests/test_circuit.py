@@ -0,0 +1,45 @@
+from conftest import load_module
+
+circuit = load_module("services/circuit.py")
+
+
+def tripped_breaker():
+    breaker = circuit.CircuitBreaker("test", latency_slo_ms=100, window=10, min_samples=3, cooldown_s=0)
+    for _ in range(3):
+        breaker.record(0.5, ok=True)
+    assert breaker.state == "open"
+    return breaker
+
+
+def test_probe_success_closes():
+    breaker = tripped_breaker()
+    assert breaker.allow() == (True, True)
+    assert breaker.allow() == (False, False)
+    breaker.record(0.01, ok=True, probe=True)
+    assert breaker.state == "closed"
+
+
+def test_slow_probe_reopens():
+    breaker = tripped_breaker()
+    breaker.allow()
+    breaker.record(0.5, ok=True, probe=True)
+    assert breaker.state == "open"
+
+
+def test_stale_request_cannot_resolve_or_release_probe():
+    breaker = tripped_breaker()
+    assert breaker.allow() == (True, True)
+    # A request admitted while the circuit was closed finishes during the probe
+    breaker.record(0.01, ok=True)
+    breaker.record(None, ok=False)
+    breaker.release(False)
+    assert breaker.state == "half_open"
+    assert breaker.allow() == (False, False)
+
+
+def test_released_probe_lets_the_next_request_probe():
+    breaker = tripped_breaker()
+    assert breaker.allow() == (True, True)
+    breaker.release(True)
+    assert breaker.state == "half_open"
+    assert breaker.allow() == (True, True)
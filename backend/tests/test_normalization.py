@@ -0,0 +1,68 @@
+import unicodedata
+
+import pytest
+
+from services.normalization import NormalizedText, normalize
+
+YA = "য়"  # য + nukta (NFC form of precomposed য়)
+KHANDA_TA_ZWJ = "ত্‍"  # ত + hasanta + ZWJ (Unicode 4.0 khanda ta)
+SPLIT_AA = "অা"  # অ + া
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("য়", YA),  # precomposed য়
+    (KHANDA_TA_ZWJ, "ৎ"),
+    ("ক্‌ষ", "ক্ষ"),  # ZWNJ dropped
+    ("ক্্ষ", "ক্ষ"),  # repeated hasanta
+    (SPLIT_AA + "ম", "আম"),
+    ("কে‍া", "কো"),  # joiner between ে and া
+    ("ডা়", "ড়া"),  # nukta typed after the vowel sign
+    ("plain ascii", "plain ascii"),
+])
+def test_normalize(raw, expected):
+    assert normalize(raw) == expected
+
+
+def test_normalize_is_idempotent():
+    text = "য়া " + SPLIT_AA + "ম " + KHANDA_TA_ZWJ
+    once = normalize(text)
+    assert normalize(once) == once
+    assert unicodedata.is_normalized("NFC", once)
+
+
+def test_unchanged_text_maps_spans_to_themselves():
+    normalized = NormalizedText("আমি ভাত খাই")
+    assert not normalized.changed
+    assert normalized.span(4, 7) == (4, 7)
+
+
+def test_span_round_trip_over_words():
+    original = SPLIT_AA + "ম  ক্‌ষমা " + KHANDA_TA_ZWJ + " য়া"
+    normalized = NormalizedText(original)
+    assert normalized.changed
+    original_words = original.split()
+    normalized_words = normalized.text.split()
+    assert len(original_words) == len(normalized_words)
+
+    position = 0
+    for raw, folded in zip(original_words, normalized_words):
+        start = normalized.text.index(folded, position)
+        position = start + len(folded)
+        o_start, o_end = normalized.span(start, position)
+        assert original[o_start:o_end] == raw
+        assert normalize(original[o_start:o_end]) == folded
+
+
+def test_span_never_cuts_a_cluster():
+    original = SPLIT_AA + "ম"  # অ + া folds into one character
+    normalized = NormalizedText(original)
+    assert normalized.text == "আম"
+    assert normalized.span(0, 1) == (0, 2)
+    assert normalized.span(1, 2) == (2, 3)
+
+
+def test_empty_and_end_spans():
+    original = SPLIT_AA + "ম"
+    normalized = NormalizedText(original)
+    assert normalized.span(0, 0) == (0, 0)
+    assert normalized.span(len(normalized.text), len(normalized.text)) == (len(original), len(original))
@@ -0,0 +1,83 @@
+import pytest
+
+from conftest import load_module
+
+placeholders = load_module("services/translation/placeholders.py")
+mask, restore = placeholders.mask, placeholders.restore
+
+
+@pytest.mark.parametrize("text", [
+    "He finished 2nd in the 100m race at 5pm.",
+    "Prices fell in the 1990s; the shop opens at 10am.",
+    "4G coverage reached the village.",
+    "Mr.Rahman met the minister.",
+    "Write it e.g. like this, i.e. carefully.",
+    "He said utf8 and base64 are encodings.",
+])
+def test_ordinary_text_is_not_masked(text):
+    assert mask(text) == (text, [])
+
+
+@pytest.mark.parametrize("span, kind", [
+    ("https://example.org/a?b=1", "url"),
+    ("news@example.com", "email"),
+    ("user_id", "identifier"),
+    ("os.path.join", "identifier"),
+    ("README.md", "identifier"),
+    ("camelCase", "identifier"),
+    ("A4", "identifier"),
+    ("MP3", "identifier"),
+    ("GPT4o", "identifier"),
+    ("1,000,000", "number"),
+    ("12/05/2024", "number"),
+    ("10:30", "number"),
+    ("৩.১৪", "number"),
+    ("`x = 1`", "code"),
+])
+def test_protected_spans_are_masked(span, kind):
+    masked, protected = mask(f"see {span} now")
+    assert masked == "see [1] now"
+    assert protected == [(kind, span)]
+
+
+def test_round_trip():
+    text = "Visit https://x.org at 10:30 and open config.py"
+    masked, protected = mask(text)
+    assert restore(masked, protected) == text
+
+
+def test_restore_bengali_digits_only_for_numbers():
+    protected = [("number", "2024"), ("identifier", "A4")]
+    assert restore("[1] সালে [2] কাগজ", protected, bengali_digits=True) == "২০২৪ সালে A4 কাগজ"
+
+
+def test_restore_reads_bengali_and_spaced_placeholders():
+    protected = [("number", "42"), ("url", "https://x.org")]
+    assert restore("[ ১ ] দেখুন [2 ]", protected) == "42 দেখুন https://x.org"
+
+
+def test_restore_reinserts_dropped_placeholder_before_punctuation():
+    protected = [("url", "https://x.org")]
+    assert restore("এখন যান।", protected) == "এখন যান https://x.org।"
+
+
+def test_restore_expands_repeated_placeholder_once():
+    protected = [("url", "https://x.org")]
+    restored = restore("[1] দেখুন [1] এখন", protected)
+    assert restored.count("https://x.org") == 1
+    assert restored == "https://x.org দেখুন এখন"
+
+
+def test_placeholders_intact():
+    assert placeholders.placeholders_intact("[1] ও [২]", 2)
+    assert not placeholders.placeholders_intact("[1]", 2)
+    assert not placeholders.placeholders_intact("[1] [1] [2]", 2)
+
+
+def test_stream_restorer_matches_restore():
+    protected = [("url", "https://x.org"), ("number", "42")]
+    restorer = placeholders.StreamRestorer(protected)
+    pieces = ["দেখুন [", "1] এবং ", "[2", "] ও [1]"]
+    streamed = "".join(restorer.feed(piece) for piece in pieces) + restorer.flush()
+    assert streamed.count("https://x.org") == 1
+    assert "42" in streamed
@@ -0,0 +1,35 @@
+import time
+
+from conftest import load_module
+
+memory = load_module("services/translation/memory.py")
+
+
+def test_disk_tier_is_pruned_to_max_rows(tmp_path):
+    tm = memory.TranslationMemory(str(tmp_path / "tm.db"), max_entries=4, max_rows=5, prune_every=3)
+    tm.open()
+    for i in range(12):
+        tm.put_many({f"k{i}": f"v{i}"})
+    assert tm.disk_rows() <= 5
+    # The newest rows survive
+    assert tm.get_many(["k11"]) == {"k11": "v11"}
+    tm.close()
+
+    reopened = memory.TranslationMemory(str(tmp_path / "tm.db"), max_rows=2)
+    reopened.open()
+    assert reopened.stats()["disk_rows"] == 2
+    reopened.close()
+
+
+def test_expired_rows_are_pruned_on_open(tmp_path):
+    tm = memory.TranslationMemory(str(tmp_path / "tm.db"))
+    tm.open()
+    tm.put_many({"a": "1", "b": "2"})
+    tm.close()
+    time.sleep(0.01)
+
+    reopened = memory.TranslationMemory(str(tmp_path / "tm.db"), max_age_s=0.005)
+    reopened.open()
+    assert reopened.disk_rows() == 0
+    assert reopened.stats()["pruned"] == 2
+    reopened.close()
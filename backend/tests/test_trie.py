@@ -0,0 +1,118 @@
+import os
+import random
+
+import pytest
+
+from conftest import load_module
+
+trie = load_module("services/spelling/trie.py")
+
+WORDS = {
+    "আমি": 50, "আমরা": 30, "তুমি": 40, "ভাত": 20, "খাই": 25, "বাংলা": 60,
+    "বাংলাদেশ": 35, "স্কুল": 10, "করা": 45, "করি": 15, "কলম": 5, "কমল": 3,
+}
+
+
+def osa_distance(a, b):
+    """Reference optimal string alignment distance"""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+
+@pytest.fixture(scope="module")
+def lexicon():
+    data, nodes, words = trie.encode_trie(WORDS.items())
+    assert words == len(WORDS)
+    lexicon = trie.TrieLexicon(data=data)
+    yield lexicon
+    lexicon.close()
+
+
+def test_exact_lookup(lexicon):
+    assert "বাংলা" in lexicon
+    assert lexicon.count("বাংলাদেশ") == 35
+    assert "বাং" not in lexicon
+    assert lexicon.lookup("ভাত") == [("ভাত", 0, 20)]
+
+
+def test_distance_one(lexicon):
+    # Substitution and deletion
+    assert lexicon.lookup("করো", 2)[:2] == [("করা", 1, 45), ("করি", 1, 15)]
+    assert ("আমি", 1, 50) in lexicon.lookup("আম", 2)
+
+
+def test_transposition_is_one_edit(lexicon):
+    assert lexicon.lookup("কলম", 2) == [("কলম", 0, 5)]
+    assert lexicon.lookup("লকম", 1) == [("কলম", 1, 5)]
+
+
+def test_distance_two(lexicon):
+    found = lexicon.lookup("বাংলাদে", 2)
+    assert ("বাংলাদেশ", 1, 35) in found
+    # Closest only: বাংলা at distance 1 hides বাংলাদেশ at distance 2
+    assert lexicon.lookup("বাংলাদ", 2) == [("বাংলা", 1, 60)]
+    assert ("বাংলাদেশ", 2, 35) in lexicon.lookup("বাংলাদ", 2, closest=False)
+
+
+def test_search_matches_brute_force(lexicon):
+    rng = random.Random(5)
+    alphabet = sorted({ch for word in WORDS for ch in word})
+    words = sorted(WORDS)
+    for _ in range(300):
+        query = list(rng.choice(words))
+        for _ in range(rng.randint(0, 3)):
+            i = rng.randrange(len(query) + 1)
+            edit = rng.choice(("delete", "insert", "replace", "swap"))
+            if edit == "insert" or not query:
+                query.insert(i, rng.choice(alphabet))
+            elif edit == "delete":
+                del query[min(i, len(query) - 1)]
+            elif edit == "replace":
+                query[min(i, len(query) - 1)] = rng.choice(alphabet)
+            elif len(query) > 1:
+                j = min(i, len(query) - 2)
+                query[j], query[j + 1] = query[j + 1], query[j]
+        query = "".join(query)
+
+        for bound in (1, 2):
+            expected = {(word, osa_distance(query, word)) for word in WORDS}
+            expected = {(word, d) for word, d in expected if d <= bound}
+            found = {(term, d) for term, d, _ in lexicon.lookup(query, bound, closest=False)}
+            if query in WORDS:
+                expected = {(query, 0)}
+            assert found == expected, query
+
+
+def test_file_round_trip_and_freshness(tmp_path):
+    lexicon_path = tmp_path / "lexicon.txt"
+    lexicon_path.write_text("".join(f"{w} {c}\n" for w, c in WORDS.items()), encoding="utf-8")
+    trie_path = str(tmp_path / "lexicon.trie")
+    assert not trie.trie_is_fresh(str(lexicon_path), trie_path)
+
+    nodes, words = trie.build_trie(trie.read_lexicon(str(lexicon_path)), trie_path)
+    assert words == len(WORDS)
+    assert trie.read_header(trie_path)[3] == nodes
+    assert trie.trie_is_fresh(str(lexicon_path), trie_path)
+
+    mapped = trie.TrieLexicon(trie_path)
+    assert mapped.count("আমরা") == 30
+    mapped.close()
+
+    # Another format version is stale
+    with open(trie_path, "r+b") as f:
+        f.seek(4)
+        f.write((trie.VERSION + 1).to_bytes(4, "little"))
+    assert trie.read_header(trie_path) is None
+    assert not trie.trie_is_fresh(str(lexicon_path), trie_path)
+    with pytest.raises(ValueError):
+        trie.TrieLexicon(trie_path)
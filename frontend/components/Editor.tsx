@@ -156,6 +156,7 @@ export default function Editor() {
           lang: 'bn',
           checkGrammar: true,
           checkSpelling: true,
+          profile: 'interactive', // Live feedback: fast greedy decoding
         });
 
         console.log('✅ Analysis result:', result.errors.length, 'errors found');
@@ -23,11 +23,14 @@ apiClient.interceptors.request.use(request => {
   return request;
 });
 
+export type DecodingProfile = 'interactive' | 'balanced' | 'quality';
+
 export interface AnalyzeRequest {
   text: string;
   lang?: string;
   checkGrammar?: boolean;
   checkSpelling?: boolean;
+  profile?: DecodingProfile;
 }
 
 export interface AnalyzeResponse {
@@ -51,6 +54,7 @@ export interface TranslateRequest {
   text: string;
   source_lang?: string;
   target_lang?: string;
+  profile?: DecodingProfile;
 }
 
 export interface TranslateResponse {